@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+"""
+ Audio sources for the AudioProcessor
+
+    - an AudioSource delivers blocks of interleaved int16 samples to a sink, the AudioProcessor capture callback
+    - PyAudioSource captures from a sound card (the original loopback capture)
+    - FileSource plays a WAV (or FLAC etc via soundfile) file in real time or as fast as the pipeline can take it
+    - PipeSource reads raw S16_LE PCM from a FIFO or stdin, eg Moode/Volumio/squeezelite pipe outputs
+    - SyntheticSource generates a sine, noise or sweep, so the visualiser runs and DSP cost can be
+      measured without a sound card
+
+    make_source() builds one from a spec string, eg 'wav:/music/test.wav', 'pipe:/tmp/snapfifo', 'pipe:-',
+    'sine:440', 'noise', 'sweep:20-20000'
+
+    Every source delivers samples in the numpy dtype of its format (see AUDIO_FORMATS), packed 24 bit input is
+    widened to int32 as it is read so the pipeline never sees 3 byte samples
+
+ baloothebear4
+"""
+
+import  sys, time, threading
+import  numpy as np
+import  pyaudio
+import  wave
+
+# Sample formats: numpy dtype in the pipeline, full scale value, bytes per sample on the wire, PyAudio format
+AUDIO_FORMATS = {
+    'int16'  : (np.int16,   2.0**15, 2, pyaudio.paInt16),
+    'int24'  : (np.int32,   2.0**31, 3, pyaudio.paInt24),    # packed S24_3LE, widened into the top of an int32
+    'int32'  : (np.int32,   2.0**31, 4, pyaudio.paInt32),
+    'float32': (np.float32, 1.0,     4, pyaudio.paFloat32) }
+
+def unpack24(raw, out):
+    """ Widen packed little endian 24 bit samples into the top three bytes of the int32 array out, returns the samples filled """
+    raw   = np.frombuffer(raw, dtype=np.uint8)
+    n     = len(raw) // 3
+    wide  = out.view(np.uint8).reshape(-1, 4)
+    wide[:n, 0]  = 0
+    wide[:n, 1:] = raw[:n*3].reshape(-1, 3)
+    return out[:n]
+
+
+class AudioSource:
+    """
+    Base class: start(sink) begins delivering blocks of frames x channels interleaved int16 samples by calling
+    sink(block).  The block may be a view that is reused for the next block, the sink must copy it (the ring does)
+    """
+
+    def __init__(self, rate=44100, channels=2, frames=2048, format='int16'):
+        self.rate     = rate
+        self.channels = channels
+        self.frames   = frames
+        self.format   = format
+        self.sink     = None
+        self.dtype, self.fullscale, self.sampwidth, self.paformat = AUDIO_FORMATS[format]
+
+    def start(self, sink, backpressure=None):
+        self.sink = sink
+
+    def stop(self):
+        pass
+
+    def latency(self):
+        """ Input latency in seconds ahead of the first block, ie what is buffered before the sink sees it """
+        return 0.0
+
+    def __str__(self):
+        return "%s> %dHz %s, %d channels, %d frames per block" % (self.__class__.__name__, self.rate, self.format, self.channels, self.frames)
+
+
+class PyAudioSource(AudioSource):
+    """ Captures from the sound card (or loopback device) whose name contains device, through a PyAudio callback """
+
+    def __init__(self, device='BlackHole 2ch', rate=44100, channels=2, frames=2048, format='int16'):
+        AudioSource.__init__(self, rate, channels, frames, format)
+        self.recorder = pyaudio.PyAudio()
+        self.stream   = None
+        self.find_device_index(device)
+
+    def find_device_index(self, device):
+        p = self.recorder
+        try:
+            # Try to find the loopback device
+            for i in range(p.get_device_count()):
+                info = p.get_device_info_by_index(i)
+                if device.lower() in info['name'].lower():
+                    self.device = i
+                    break
+
+        except Exception as e:
+            print(f"\nPyAudioSource.find_device_index> ❌ ERROR: {e}")
+            print("PyAudioSource.find_device_index> Check your ALSA configuration and device permissions")
+            self.device = 4
+
+    @property
+    def device_name(self):
+        return self.recorder.get_device_info_by_index(self.device)['name']
+
+    def start(self, sink, backpressure=None):
+        """ sink has the PyAudio stream callback signature and return value """
+        AudioSource.start(self, sink)
+        callback = sink
+        if self.sampwidth == 3:
+            self.block = np.zeros(self.frames * self.channels, dtype=self.dtype)
+            callback   = self._callback24
+        self.stream = self.recorder.open(format=self.paformat, rate=self.rate, channels=self.channels, input=True, \
+                                         input_device_index=self.device, frames_per_buffer=self.frames, stream_callback=callback)
+        self.stream.start_stream()
+
+    def _callback24(self, in_data, frame_count, time_info, status):
+        return self.sink(unpack24(in_data, self.block), frame_count, time_info, status)
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+        self.recorder.terminate()
+
+    def latency(self):
+        return self.stream.get_input_latency() if self.stream is not None else 0.0
+
+    def __str__(self):
+        return "PyAudioSource> %s index %d, %dHz %s, %d frames per block" % (self.device_name, self.device, self.rate, self.format, self.frames)
+
+
+class ThreadedSource(AudioSource):
+    """
+    Base of the sources that produce blocks on their own thread: read_block() returns the next interleaved int16
+    block (or None at the end), which is passed to the sink
+        - realtime paces the blocks at the sample rate, otherwise they are delivered as fast as the sink accepts
+          them, waiting while backpressure() is True so no blocks are dropped
+    """
+    def __init__(self, rate=44100, channels=2, frames=2048, realtime=True, format='int16'):
+        AudioSource.__init__(self, rate, channels, frames, format)
+        self.realtime    = realtime
+        self.blocks      = 0
+        self._stop_event = threading.Event()
+        self.thread      = None
+
+    def start(self, sink, backpressure=None):
+        AudioSource.start(self, sink)
+        self.backpressure = backpressure
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+        self.close()
+
+    def read_block(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _run(self):
+        period = self.frames / self.rate
+        due    = time.perf_counter()
+        while not self._stop_event.is_set():
+            if self.realtime:
+                wait = due - time.perf_counter()
+                if wait > 0: self._stop_event.wait(wait)
+                due += period
+            elif self.backpressure is not None and self.backpressure():
+                self._stop_event.wait(period/8)
+                continue
+
+            try:
+                block = self.read_block()
+            except Exception as e:
+                print("%s._run> read failed %s" % (self.__class__.__name__, e))
+                break
+            if block is None:
+                print("%s._run> end of audio after %d blocks" % (self.__class__.__name__, self.blocks))
+                break
+
+            self.sink(block)
+            self.blocks += 1
+
+
+class FileSource(ThreadedSource):
+    """
+    Plays an audio file, looping at the end if loop is set.  WAV files (16, 24 or 32 bit PCM) are read with the
+    wave module, any other format (FLAC, OGG ...) needs the soundfile package.  Mono files are duplicated into both
+    channels, and samples are rescaled if the file's format differs from the pipeline's
+    """
+
+    def __init__(self, path, rate=44100, channels=2, frames=2048, realtime=True, loop=True, format='int16'):
+        ThreadedSource.__init__(self, rate, channels, frames, realtime, format)
+        self.path   = path
+        self.loop   = loop
+        self.block  = np.zeros(frames * channels, dtype=self.dtype)
+        self.open()
+
+    def open(self):
+        if self.path.lower().endswith('.wav'):
+            self.file      = wave.open(self.path, 'rb')
+            self.file_rate = self.file.getframerate()
+            file_channels  = self.file.getnchannels()
+            width          = self.file.getsampwidth()
+            if width not in (2, 3, 4):
+                raise ValueError("FileSource.open> %s is not 16, 24 or 32 bit PCM" % self.path)
+            self.file_format = {2: 'int16', 3: 'int24', 4: 'int32'}[width]
+            if width == 3:
+                self.wide   = np.zeros(self.frames * file_channels, dtype=np.int32)
+                self.reader = lambda n: unpack24(self.file.readframes(n), self.wide)
+            else:
+                dtype       = AUDIO_FORMATS[self.file_format][0]
+                self.reader = lambda n: np.frombuffer(self.file.readframes(n), dtype=dtype)
+            self.rewind    = self.file.rewind
+        else:
+            import soundfile
+            self.file      = soundfile.SoundFile(self.path)
+            self.file_rate = self.file.samplerate
+            file_channels  = self.file.channels
+            # soundfile converts to the pipeline's dtype itself, int32 is full scale as the widened 24 bit samples are
+            self.file_format = 'int32' if self.format == 'int24' else self.format
+            self.reader    = lambda n: self.file.read(n, dtype=self.file_format).reshape(-1)
+            self.rewind    = lambda: self.file.seek(0)
+
+        self.file_channels = file_channels
+        if self.file_rate != self.rate:
+            print("FileSource.open> %s is %dHz, it will play at %dHz" % (self.path, self.file_rate, self.rate))
+
+    def read_block(self):
+        samples = self.reader(self.frames)
+        if len(samples) == 0 and self.loop:
+            self.rewind()
+            samples = self.reader(self.frames)
+        if len(samples) == 0:
+            return None
+
+        file_dtype, file_scale = AUDIO_FORMATS[self.file_format][:2]
+        same_format = file_dtype == self.dtype and file_scale == self.fullscale
+
+        # zero copy when the file already has the pipeline's layout and a whole block was read
+        if same_format and self.file_channels == self.channels and len(samples) == len(self.block):
+            return samples
+
+        frames = samples.reshape(-1, self.file_channels)
+        frames = frames[:, :self.channels] if self.file_channels >= self.channels else frames[:, :1]
+        if not same_format:
+            frames = frames * (self.fullscale / file_scale)
+        block  = self.block.reshape(-1, self.channels)
+        block[:] = 0
+        block[:len(frames)] = frames
+        return self.block
+
+    def close(self):
+        self.file.close()
+
+
+class PipeSource(ThreadedSource):
+    """
+    Reads raw interleaved little endian PCM (S16_LE, S24_3LE, S32_LE or FLOAT_LE, from the format) from a named
+    pipe (FIFO) or stdin ('-') into a preallocated block.  The writer (MPD/squeezelite pipe output) sets the pace,
+    so reads block rather than being timed
+    """
+
+    def __init__(self, path='-', rate=44100, channels=2, frames=2048, format='int16'):
+        ThreadedSource.__init__(self, rate, channels, frames, realtime=False, format=format)
+        self.path   = path
+        self.block  = np.zeros(frames * channels, dtype=self.dtype)
+        self.raw    = np.zeros(frames * channels * self.sampwidth, dtype=np.uint8) if self.sampwidth == 3 else self.block
+        self.bytes  = memoryview(self.raw).cast('B')
+        self.pipe   = sys.stdin.buffer if path == '-' else open(path, 'rb', buffering=0)
+
+    def read_block(self):
+        # a pipe can return short reads, fill the whole block before delivering it
+        got = 0
+        while got < len(self.bytes):
+            n = self.pipe.readinto(self.bytes[got:])
+            if not n:
+                return None
+            got += n
+        return unpack24(self.raw, self.block) if self.sampwidth == 3 else self.block
+
+    def close(self):
+        if self.pipe is not sys.stdin.buffer:
+            self.pipe.close()
+
+    def __str__(self):
+        return "PipeSource> %s %s, %d frames per block" % (self.path, self.format, self.frames)
+
+
+class SyntheticSource(ThreadedSource):
+    """
+    Generates a test signal into a preallocated block: 'sine' at freq Hz, white 'noise', or a logarithmic 'sweep'
+    from freq to freq_end over sweep_time seconds.  Phase is carried between blocks so there are no discontinuities
+    """
+
+    def __init__(self, signal='sine', freq=440.0, freq_end=20000.0, level=0.5, sweep_time=10.0, rate=44100, channels=2, frames=2048, realtime=True, format='int16'):
+        ThreadedSource.__init__(self, rate, channels, frames, realtime, format)
+        self.signal     = signal
+        self.freq       = float(freq)
+        self.freq_end   = float(freq_end)
+        self.amplitude  = level * self.fullscale
+        self.sweep_time = sweep_time
+        self.phase      = 0.0
+        self.time       = 0.0
+        self.t          = np.arange(frames) / rate
+        self.mono       = np.zeros(frames)
+        self.block      = np.zeros(frames * channels, dtype=self.dtype)
+        self.rng        = np.random.default_rng()
+
+    def read_block(self):
+        if self.signal == 'noise':
+            self.mono[:] = self.rng.uniform(-self.amplitude, self.amplitude, self.frames)
+        else:
+            if self.signal == 'sweep':
+                # instantaneous frequency rises exponentially, integrate it for the phase
+                k    = np.log(self.freq_end / self.freq) / self.sweep_time
+                f    = self.freq * np.exp(k * ((self.time + self.t) % self.sweep_time))
+                inc  = 2*np.pi * f / self.rate
+                phases = self.phase + np.cumsum(inc) - inc
+                self.phase = (phases[-1] + inc[-1]) % (2*np.pi)
+            else:
+                phases = self.phase + 2*np.pi * self.freq * self.t
+                self.phase = (self.phase + 2*np.pi * self.freq * self.frames / self.rate) % (2*np.pi)
+            np.sin(phases, out=self.mono)
+            self.mono *= self.amplitude
+
+        self.time += self.frames / self.rate
+        self.block.reshape(-1, self.channels)[:] = self.mono[:, None]
+        return self.block
+
+    def __str__(self):
+        detail = {'sine': "%.0fHz" % self.freq, 'sweep': "%.0f-%.0fHz" % (self.freq, self.freq_end)}.get(self.signal, "")
+        return "SyntheticSource> %s %s, %d frames per block" % (self.signal, detail, self.frames)
+
+
+def make_source(spec=None, device='BlackHole 2ch', rate=44100, channels=2, frames=2048, format='int16'):
+    """
+    Build an AudioSource from a spec string, None captures from the sound card device
+        'wav:<path>' or 'file:<path>' (append '?fast' to play as fast as possible), 'pipe:<fifo>' or 'pipe:-' for stdin,
+        'sine:<Hz>', 'noise', 'sweep:<from>-<to>'
+    An AudioSource instance is returned unchanged
+    """
+    if isinstance(spec, AudioSource):
+        return spec
+    if not spec or spec == 'pyaudio':
+        return PyAudioSource(device, rate, channels, frames, format)
+
+    kind, _, arg = spec.partition(':')
+    if kind in ('wav', 'file', 'flac'):
+        path, _, option = arg.partition('?')
+        return FileSource(path, rate, channels, frames, realtime=(option != 'fast'), format=format)
+    if kind == 'pipe':
+        return PipeSource(arg or '-', rate, channels, frames, format)
+    if kind == 'sine':
+        return SyntheticSource('sine', float(arg or 440), rate=rate, channels=channels, frames=frames, format=format)
+    if kind == 'noise':
+        return SyntheticSource('noise', rate=rate, channels=channels, frames=frames, format=format)
+    if kind == 'sweep':
+        low, _, high = (arg or '20-20000').partition('-')
+        return SyntheticSource('sweep', float(low), float(high or 20000), rate=rate, channels=channels, frames=frames, format=format)
+
+    raise ValueError("make_source> unknown audio source %s" % spec)
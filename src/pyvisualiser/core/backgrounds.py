@@ -55,6 +55,11 @@ class Background:
         # print("Background.__init__> background image created", self.background)    
 
 
+    @property
+    def requires(self):
+        """ The audio features the background reacts to, see Frame.required_features """
+        return self.background_base.requires if self.background_base is not None else set()
+
     def per_frame_update(self, condition=True):
         pass
 
@@ -93,6 +98,17 @@ class BackgroundLighting:
         self.treble = 0.0
         self.last_update = time.time()
 
+    @property
+    def requires(self):
+        """ The audio features used: the VU for the glows, clouds and edge light, everything for a shader's uniforms """
+        style    = self.style
+        features = set()
+        if style.reactive_glow or style.peak_accent or style.cloud or style.edge_light:
+            features.add('vu')
+        if style.shader:
+            features |= {'vu', 'bass', 'treble', 'beat', 'analysis'}
+        return features
+
     def update(self, audio_processor):
         if not audio_processor:
             return
@@ -683,6 +699,10 @@ class BackgroundBase:
         col = self.frame.colours.get(colour_name)
         return tuple(c / 255.0 for c in col[:3])
 
+    @property
+    def requires(self):
+        return self.lighting.requires if hasattr(self, 'lighting') else set()
+
     def update(self):
         # Update lighting state based on audio
         self.lighting.update(self.frame.platform)
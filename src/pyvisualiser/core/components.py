@@ -48,6 +48,7 @@ class Bar(Frame):
         - left or right
         - peak lines
     """
+    requires = set()
     def __init__(self, parent, scalers=None, align=('centre', 'bottom'), theme=None, \
                  box_size=(100,100), style=None):
 
@@ -68,6 +69,12 @@ class Bar(Frame):
         self.gradient_surface = self._create_gradient_surface()
         self._gl_texture = None
         self.bloom_states = {} # Stores smoothed bloom intensity per bar (keyed by offset)
+        self.blooms       = np.zeros(0)     # the same by bar index, for draw_many
+
+        # The colour map as 0..1 rgb, plain for flat colours and with gamma for gradients, as add_rect converts them
+        table              = np.array(self.colours.colours, dtype=float) / 255.0
+        self.colour_table  = table
+        self.gradient_table= table ** 2.2
 
         # parent += self
         # print("Bar.__init__", self.geostr())
@@ -123,6 +130,118 @@ class Bar(Frame):
         else:
             self.drawV(offset, ypc, w, peak, colour_index)
 
+    def _colours_at(self, table, colour_index, alpha):
+        """ rgba rows of the colour table at each index, clipped as Colour.get """
+        i = np.clip(colour_index, 0, self.colours.num_colours).astype(int)
+        rgb = table[i]
+        return np.column_stack((rgb, np.broadcast_to(alpha, len(rgb))))
+
+    def draw_many(self, offsets, levels, w, peaks=None, colour_indices=None):
+        """
+        Draw a row of vertical bars in one go, with the same geometry, colours, bloom and reflection as draw
+            - offsets, levels, peaks and colour_indices are arrays with one entry per bar
+            - each layer (bloom, bar, reflection, peak) goes to the renderer as one draw_rects call, so the blooms
+              are one additive batch under all the bars rather than one batch each
+        Horizontal bars and renderers without draw_rects are drawn bar by bar
+        """
+        renderer = self.platform.renderer
+        bars     = len(offsets)
+        peaks    = np.zeros(bars) if peaks is None else np.asarray(peaks, dtype=float)
+        if self.style.orient == 'horz' or not hasattr(renderer, 'draw_rects'):
+            for i in range(bars):
+                self.draw(offsets[i], levels[i], w, peaks[i], None if colour_indices is None else colour_indices[i])
+            return
+
+        self.tip_radius = int(w/2)
+        flip   = self.style.flip
+        ypc    = np.asarray(levels, dtype=float)
+        num    = self.colours.num_colours
+        fx     = self.effects
+        shrink = self.outline_w + self.padding
+        x      = self.x0 + shrink + np.asarray(offsets, dtype=float)
+        top    = self.screen_wh[1] - (self.y0 + self.h - shrink)      # as float_abs_rect with no y offset
+        abs_h  = self.abs_h
+
+        def rects(y, h, width=w, left=x):
+            return np.column_stack(np.broadcast_arrays(left, y, width, h)).astype(float)
+
+        # --- Bloom: soft-threshold then attack/release per bar, as drawV ---
+        bloom_start = fx.threshold - 0.05
+        excess      = (ypc - bloom_start) / max(0.001, 1.0 - bloom_start)
+        ratio       = np.where(ypc > bloom_start, np.clip(excess, 0.0, 1.0) ** fx.power, 0.0)
+        if len(self.blooms) != bars:
+            self.blooms = np.zeros(bars)
+        self.blooms += (ratio - self.blooms) * np.where(ratio > self.blooms, fx.attack, fx.decay)
+        self.blooms[self.blooms < 0.001] = 0.0
+
+        on = self.blooms > 0.01
+        if on.any():
+            smoothed = self.blooms[on]
+            bx, by   = x[on], ypc[on]
+            alpha    = fx.alpha * smoothed / 255.0
+            y_val    = np.maximum(by, fx.threshold)
+            bloom_h  = (y_val - fx.threshold) * abs_h
+            if flip:
+                bloom_y     = top + fx.threshold * abs_h
+                inner_scale = 1.0 + (fx.scale - 1.0) * fx.inner_glow_scale
+                outer_scale = 1.0 + (fx.scale - 1.0) * (fx.outer_glow_scale_min + fx.outer_glow_scale_max * smoothed)
+                outer_blur  = fx.blur * fx.outer_glow_blur_mult
+            else:
+                bloom_y     = top + (1.0 - y_val) * abs_h
+                inner_scale = 1.0 + (fx.scale - 1.0) * 0.2
+                outer_scale = 1.0 + (fx.scale - 1.0) * (0.5 + 0.5 * smoothed)
+                outer_blur  = fx.blur * 2.5
+
+            tip    = self._colours_at(self.gradient_table, by * num, alpha)
+            thresh = self._colours_at(self.gradient_table, np.full(len(by), fx.threshold * num), alpha)
+            inner  = (thresh, tip) if flip else (tip, thresh)
+            outer  = [c.copy() for c in inner]
+            for c in outer:
+                c[:, 3] *= 0.6
+
+            grow = w * (inner_scale - 1.0)
+            renderer.draw_rects(rects(bloom_y - grow/2, bloom_h + grow, w + grow, bx - grow/2), *inner,
+                                softness=fx.blur, axis=1.0, level=10.0, additive=True)
+            grow = w * (outer_scale - 1.0)
+            renderer.draw_rects(rects(bloom_y - grow/2, bloom_h + grow, w + grow, bx - grow/2), *outer,
+                                softness=outer_blur, axis=1.0, level=10.0, additive=True)
+
+        # --- Segmented bars with their gradient texture ---
+        if colour_indices is not None:
+            c_top = c_bot = self._colours_at(self.gradient_table, np.asarray(colour_indices, dtype=float), 1.0)
+        else:
+            ends  = self._colours_at(self.gradient_table, np.array([0, num]), 1.0)
+            c_top = np.broadcast_to(ends[0 if flip else 1], (bars, 4))
+            c_bot = np.broadcast_to(ends[1 if flip else 0], (bars, 4))
+
+        bar_style = dict(softness=self.style.edge_softness, radius=self.style.corner_radius,
+                         segments=(self.style.segment_size, self.style.segment_gap),
+                         gradient_image=self.gradient_surface, texture_holder=self)
+        renderer.draw_rects(rects(top, abs_h), c_top, c_bot, axis=1.0 if flip else -1.0, level=ypc, **bar_style)
+
+        if self.effects.reflection and not flip:
+            ref_size, ref_opacity = 0.3, 0.5
+            if isinstance(self.effects.reflection, dict):
+                ref_size    = self.effects.reflection.get('size', ref_size)
+                ref_opacity = self.effects.reflection.get('opacity', ref_opacity)
+
+            faded = [c.copy() for c in (c_bot, c_top)]
+            for c in faded:
+                c[:, 3] = ref_opacity
+            renderer.draw_rects(rects(top + abs_h, abs_h * ref_size), *faded, axis=1.0, level=ypc, **bar_style)
+
+            shown = peaks > 0.01
+            c_ref = self._colours_at(self.colour_table, num * peaks[shown], ref_opacity)
+            renderer.draw_rects(rects(top + abs_h + peaks[shown] * abs_h * ref_size, self.style.peak_h, left=x[shown]),
+                                c_ref, c_ref, softness=self.style.edge_softness)
+
+        # --- Peaks, coloured by their height as draw_peak ---
+        shown  = peaks * self.h > 0.0
+        c_peak = self._colours_at(self.colour_table, peaks[shown] * self.h, 1.0)
+        peak_y = peaks[shown] * abs_h if flip else abs_h * (1 - peaks[shown])
+        renderer.draw_rects(rects(top + peak_y, self.style.peak_h, left=x[shown]), c_peak, c_peak,
+                            softness=self.style.edge_softness)
+
     def drawV(self, offset, ypc, w, peak=0, colour_index=None):
         """ Draw Vertical Bar """
         if self.style.flip:
@@ -555,6 +674,7 @@ class Image:
 
 class ArcsOctaves(Frame):
     """ Lines are for drawing meter needles, oscilogrammes etc """
+    requires = set()
     def __init__(self, parent, wh=None, colour=None, align=('centre', 'middle'), theme='std', NumOcts=5, scalers=None):
 
         self.NumOcts = NumOcts
@@ -594,6 +714,7 @@ class ArcsOctaves(Frame):
             return v
 
 class Box(Frame):
+    requires = set()
     def __init__( self, parent, colour_index=0, theme='std', box=None, width=None, radius=5, align=('centre', 'middle') ):
 
         self.width    = box[1] if width is None else width
@@ -628,6 +749,7 @@ class Box(Frame):
 Lines are for drawing meter needles, oscilogrammes etc
 """
 class Line(Frame):
+    requires = set()
     def __init__( self, parent, colour=None, width=1, align=None, theme=None, scalers=(1.0,1.0), background=None,\
                   circle=True, endstops=(PI/2, 3* PI/2), radius=100, centre_offset=0, tick_pc=1.0, amp_scale=0.9):
 
@@ -955,6 +1077,7 @@ class Text:
 Dots are for drawing circles on progress bars, mood dots in space on visualisers etc
 """
 class Dots(Frame):
+    requires = set()
     def __init__( self, parent, colour_index=None, width=1, align=('centre', 'middle'), theme='std', scalers=(1.0,1.0), \
                   circle=True, endstops=(PI/2, 3* PI/2), radius=100, centre_offset=0, amp_scale=1.0, dotcount=1000):
 
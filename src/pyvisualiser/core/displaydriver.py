@@ -11,7 +11,7 @@ v2.0 baloothebear4 Feb 2026     Refactored - spliting out componenets eg Bar, le
 
 """
 
-import  pygame, time, math
+import  pygame, time, math, struct
 from    pygame.locals import *
 import  numpy as np
 import  warnings
@@ -46,6 +46,9 @@ class PygameRenderer:
     def draw_lines(self, color, closed, points, width=1):
         pygame.draw.lines(self.surface, color, closed, points, width)
 
+    def draw_polyline(self, color, points, width=1, closed=False, **kwargs):
+        pygame.draw.lines(self.surface, color, closed, np.asarray(points).tolist(), int(width))
+
 class GraphicsDriverPi:
     """ Raspberry PI-4B Waveshare 7.9" DSI based platform """
     BACKGROUND_COLOR = (10, 10, 20)  # Dark Blue/Grey, a nice HiFi screen background    
@@ -258,7 +261,7 @@ class GraphicsDriverGL:
         mgl_ctx = moderngl.create_context()
         self.render_context = RenderContext(mgl_ctx, (self.W, self.H), self)
         self.compositor = Compositor(self.render_context)
-        self.geometry_pass = GeometryPass(self.render_context)
+        self.geometry_pass = GeometryPass(self.render_context, packed=profile.packed_instances)
         self.compositor.add_pass(self.geometry_pass)
         self.renderer = self.geometry_pass # Components draw to the geometry pass
 
@@ -446,6 +449,114 @@ class GraphicsDriver:
                 self.events.KeyPress(event.key)
 
 
+class InstanceArena:
+    """
+    The primitives of a frame of geometry as one record each in a preallocated byte array, written at a cursor
+        - each record is rect (x, y, w, h in pixels), direction (x, y), colour0, colour1,
+          style (softness, radius, stroke, flags) and shape (seg_w, seg_gap, axis, level)
+        - flags packs gradient along u (1), pad for softness (2) and use_tex (x4: 0 = color, 1 = gradient, 2 = image)
+        - the vertex shader expands every record over a shared unit quad, so attributes are not repeated per vertex
+        - the array doubles when full and is kept, so steady frames do not allocate
+    Batches are record ranges of the arena, and the frame goes to the GPU as one write of view(), see GeometryPass.render
+    FORMAT gives the moderngl format of each attribute, this layout is all float32, see PackedInstanceArena
+    """
+    FORMAT = (('in_rect', '4f'), ('in_dir', '2f'), ('in_color0', '4f'), ('in_color1', '4f'), ('in_style', '4f'), ('in_shape', '4f'))
+    RECORD = struct.Struct('<4f2f4f4f4f4f')
+    DTYPE  = np.dtype([('rect', '<f4', 4), ('dir', '<f4', 2), ('color0', '<f4', 4), ('color1', '<f4', 4),
+                       ('style', '<f4', 4), ('shape', '<f4', 4)])     # the same record, for numpy writes
+    STRIDE = RECORD.size
+    ALONG  = (1.0, 0.0)     # direction of an axis aligned rect
+
+    def __init__(self, records=16384):
+        self.data   = np.zeros(records * self.STRIDE, dtype='u1')
+        self.bytes  = memoryview(self.data)
+        self.cursor = 0         # records written this frame
+
+    @classmethod
+    def offsets(cls):
+        """ The attribute names with their format and byte offset in a record """
+        offset, attrs = 0, []
+        for name, fmt in cls.FORMAT:
+            attrs.append((name, fmt, offset))
+            offset += int(fmt[0]) * int(fmt[2:] or 4)      # eg '4f1' is 4 x 1 byte, '2f' 2 x 4 bytes
+        return attrs
+
+    @staticmethod
+    def colour(rgba):
+        return rgba
+
+    @staticmethod
+    def colours(rgba):
+        return rgba
+
+    def reserve(self, records):
+        """ Return the index of the next free record, growing the arena if needed """
+        start = self.cursor
+        if (start + records) * self.STRIDE > len(self.data):
+            grown = np.zeros(max(2 * len(self.data), (start + records) * self.STRIDE), dtype='u1')
+            grown[:start * self.STRIDE] = self.data[:start * self.STRIDE]
+            self.data  = grown
+            self.bytes = memoryview(grown)
+        self.cursor = start + records
+        return start
+
+    def rect(self, x, y, w, h, colour0, colour1, style, shape, direction=ALONG, gradient=0.0, pad=1.0):
+        """
+        One primitive: a w x h rect from (x, y) running along direction, h < 0 runs it upwards.  colour0 and colour1
+        are the rgba (0..1) at the start and end of the gradient axis (0 = v, down the rect, 1 = u, along it), pad
+        extends the quad for the blur of soft rects, style is softness, radius, stroke and use_tex, shape the 4 floats
+        passed on to the fragment shader
+        """
+        softness, radius, stroke, use_tex = style
+        flags  = gradient + 2.0 * pad + 4.0 * use_tex
+        offset = self.reserve(1) * self.STRIDE     # before self.bytes, which may grow
+        self.RECORD.pack_into(self.bytes, offset, x, y, w, h, *direction, *self.colour(colour0), *self.colour(colour1),
+                              softness, radius, stroke, flags, *shape)
+
+    def rects(self, rect, colour0, colour1, style, shape, direction=ALONG, gradient=0.0, pad=1.0):
+        """ As rect for n primitives at once, each argument an (n, 4) array, or direction (n, 2), or broadcast to one """
+        n     = len(rect)
+        start = self.reserve(n) * self.STRIDE
+        block = self.data[start:start + n * self.STRIDE].view(self.DTYPE)
+        block['rect']   = rect
+        block['dir']    = direction
+        block['color0'] = self.colours(colour0)
+        block['color1'] = self.colours(colour1)
+        block['style']  = style
+        block['style'][:, 3] = gradient + 2.0 * pad + 4.0 * block['style'][:, 3]
+        block['shape']  = shape
+
+    def view(self):
+        """ The bytes written this frame, without a copy """
+        return self.bytes[:self.cursor * self.STRIDE]
+
+    def clear(self):
+        self.cursor = 0
+
+
+class PackedInstanceArena(InstanceArena):
+    """
+    The compact layout of the instance records for shared memory GPUs (eg Pi 4) where the upload bandwidth counts,
+    56 bytes a record rather than 88 so the same buffer holds over half as many primitives again
+        - rect and direction stay float32 so long lines and large panels keep their pixel positions
+        - shape stays float32 too, blit puts the atlas uv offset and scale there
+        - colours are normalised unsigned bytes, style half floats (exact for the flags and the radii and widths used)
+    """
+    FORMAT = (('in_rect', '4f'), ('in_dir', '2f'), ('in_color0', '4f1'), ('in_color1', '4f1'), ('in_style', '4f2'), ('in_shape', '4f'))
+    RECORD = struct.Struct('<4f2f4B4B4e4f')
+    DTYPE  = np.dtype([('rect', '<f4', 4), ('dir', '<f4', 2), ('color0', 'u1', 4), ('color1', 'u1', 4),
+                       ('style', '<f2', 4), ('shape', '<f4', 4)])
+    STRIDE = RECORD.size
+
+    @staticmethod
+    def colour(rgba):
+        return [min(255, max(0, int(c * 255.0 + 0.5))) for c in rgba]
+
+    @staticmethod
+    def colours(rgba):
+        return np.clip(np.asarray(rgba) * 255.0 + 0.5, 0, 255).astype('u1')
+
+
 '''
 Entry point to OpenGL and the GPU based graphics processing
 
@@ -456,7 +567,7 @@ class GeometryPass(RenderPass):
     It replaces the old monolithic GLManager and acts as the main 'renderer' object
     that UI components interact with.
     """
-    def __init__(self, context: RenderContext):
+    def __init__(self, context: RenderContext, packed=False):
         super().__init__(context)
         self.platform = context.platform
         
@@ -470,16 +581,14 @@ class GeometryPass(RenderPass):
         self.prog = self.ctx.program(
             vertex_shader="""
                 #version 330
-                in vec2 in_vert;
-                in vec2 in_uv;
-                in vec4 in_color;
-                in float in_softness;
-                in vec3 in_params; // width, height, radius
-                in float in_stroke; // stroke width (0 = fill)
-                in vec2 in_segments; // segment_size, gap_size
-                in float in_axis; // 0 = x (horz), 1 = y (vert)
-                in float in_level; // 0.0 to 1.0 fill level. For Images: uv_scale.y
-                in float in_use_tex; // 0.0 = color, 1.0 = gradient, 2.0 = image
+                uniform vec2 screen; // pixels, for the transform to clip space
+                in vec2 in_corner; // unit quad corner 0..1, shared by every instance
+                in vec4 in_rect; // x, y, w, h in pixels, h < 0 runs the rect upwards
+                in vec2 in_dir; // direction x, y (unit) of the rect's width
+                in vec4 in_color0; // colour at the start of the gradient axis
+                in vec4 in_color1; // colour at the end of the gradient axis
+                in vec4 in_style; // softness, radius, stroke width (0 = fill), flags: gradient along u (1), pad (2), use_tex x4 (0 = color, 1 = gradient, 2 = image)
+                in vec4 in_shape; // segment_size, gap_size (Images: uv offset), axis 0 = x (horz), 1 = y (vert) (Images: uv_scale.x), level 0.0 to 1.0 fill level (Images: uv_scale.y)
                 out vec4 v_color;
                 out vec2 v_uv;
                 out vec2 v_uv_raw; // Unmodified UVs for texture sampling
@@ -491,17 +600,35 @@ class GeometryPass(RenderPass):
                 out float v_level;
                 out float v_use_tex;
                 void main() {
-                    gl_Position = vec4(in_vert, 0.0, 1.0);
-                    v_color = in_color;
-                    v_uv = in_uv;
-                    v_uv_raw = in_uv;
-                    v_softness = in_softness;
-                    v_params = in_params;
-                    v_stroke = in_stroke;
-                    v_segments = in_segments;
-                    v_axis = in_axis;
-                    v_level = in_level;
-                    v_use_tex = in_use_tex;
+                    vec2 size = abs(in_rect.zw);
+                    float flags = floor(in_style.w + 0.5);
+                    float use_tex = floor(flags / 4.0);
+                    float padded = mod(floor(flags / 2.0), 2.0);
+                    float along_u = mod(flags, 2.0);
+
+                    // Pad the quad so the blur of soft rects is not clipped, matches the blur in the fragment shader
+                    float pad = 0.0;
+                    if (padded > 0.5 && in_style.x > 0.0) {
+                        pad = in_style.x * max(20.0, min(size.x, size.y) * 0.8) * 1.5 + 10.0;
+                    }
+
+                    // UVs are 0..1 over the rect itself, beyond that into the padding
+                    vec2 uv = (in_corner * (size + 2.0 * pad) - pad) / size;
+                    vec2 dir = in_dir;
+                    vec2 perp = vec2(-dir.y, dir.x);
+                    vec2 pos = in_rect.xy + dir * (uv.x * in_rect.z) + perp * (uv.y * in_rect.w);
+
+                    gl_Position = vec4(pos.x / screen.x * 2.0 - 1.0, 1.0 - pos.y / screen.y * 2.0, 0.0, 1.0);
+                    v_color = mix(in_color0, in_color1, along_u > 0.5 ? in_corner.x : in_corner.y);
+                    v_uv = uv;
+                    v_uv_raw = uv;
+                    v_softness = in_style.x;
+                    v_params = vec3(size, in_style.y);
+                    v_stroke = in_style.z;
+                    v_segments = in_shape.xy;
+                    v_axis = in_shape.z;
+                    v_level = in_shape.w;
+                    v_use_tex = use_tex;
                 }
             """,
             fragment_shader="""
@@ -620,35 +747,42 @@ class GeometryPass(RenderPass):
             """
         )
 
-        # Buffer to hold vertex data (x, y, u, v, r, g, b, a, s, w, h, rad, stroke, seg_w, seg_gap, axis, level, use_tex) -> 18 floats per vertex
-        self.vbo = self.ctx.buffer(reserve=4 * 1024 * 1024) 
-        self.vao = self.ctx.simple_vertex_array(self.prog, self.vbo, 'in_vert', 'in_uv', 'in_color', 'in_softness', 'in_params', 'in_stroke', 'in_segments', 'in_axis', 'in_level', 'in_use_tex')
-        
-        self.render_queue = []
+        # One record per rect, line or image (see InstanceArena) drawn as an instance of a shared unit quad,
+        # the instance buffer grows to match the arena when a frame needs more.  The packed layout suits shared memory GPUs
+        self.arena = PackedInstanceArena() if packed else InstanceArena()
+        self.quad = self.ctx.buffer(np.array([0, 0, 1, 0, 0, 1, 0, 1, 1, 0, 1, 1], dtype='f4'))
+        self.vbo = self.ctx.buffer(reserve=self.arena.data.nbytes)
+        self.instance_attrs = self.arena.offsets()
+        self.vao = self.ctx.vertex_array(self.prog, [(self.quad, '2f', 'in_corner'),
+                                                     (self.vbo, ' '.join(fmt for _, fmt, _ in self.instance_attrs) + '/i',
+                                                      *[name for name, _, _ in self.instance_attrs])])
+        self.bound_first = 0    # first record the instance attributes are bound to
         
-        # Batching state
+        # Batching state: each batch is a range of arena records drawn with the same blend mode and texture
         self.batches = []
-        self.render_queue = []
+        self.batch_start = 0
         self.current_additive = False
         self.current_texture = None
 
     def clear_batch(self):
         """Clears the vertex data queue for the next frame."""
         self.batches = []
-        self.render_queue = []
+        self.arena.clear()
+        self.batch_start = 0
         self.current_additive = False
         self.current_texture = None
 
     def _push_batch(self):
-        """Moves current queue to the batch list."""
-        if self.render_queue:
+        """Closes the records drawn since the last batch as a new batch."""
+        if self.arena.cursor > self.batch_start:
             self.batches.append({
                 'type': 'geometry',
                 'additive': self.current_additive,
                 'texture': self.current_texture,
-                'data': self.render_queue
+                'first': self.batch_start,
+                'count': self.arena.cursor - self.batch_start
             })
-            self.render_queue = []
+            self.batch_start = self.arena.cursor
 
     def set_additive(self, additive):
         if additive != self.current_additive:
@@ -713,102 +847,91 @@ class GeometryPass(RenderPass):
         self.set_additive(additive)
 
         if gradient_image:
-            # Handle texture creation/caching
-            texture = None
-            if texture_holder and hasattr(texture_holder, '_gl_texture') and texture_holder._gl_texture:
-                texture = texture_holder._gl_texture
-            
-            if texture is None:
-                # If we are creating a new texture, we must flush previous draws to avoid state mix-up
-                # (though strictly speaking, if we bind to unit 0, it affects next draw call)
-                # But here we only flush if we are changing the bound texture.
-                
-                rgba_data = pygame.image.tostring(gradient_image, "RGBA", False)
-                texture = self.ctx.texture(gradient_image.get_size(), 4, rgba_data)
-                
-                if texture_holder:
-                    texture_holder._gl_texture = texture
-            
-            # Only flush and rebind if the texture has changed
-            if self.current_texture != texture:
-                self._push_batch()
-                self.current_texture = texture
-            
+            self.use_gradient_texture(gradient_image, texture_holder)
             self.add_rect(coords, color, opacity, softness, width, radius, segments, gradient, axis, level, use_tex=1.0)
         else:
             self.add_rect(coords, color, opacity, softness, width, radius, segments, gradient, axis, level, use_tex=0.0)
 
+    def use_gradient_texture(self, gradient_image, texture_holder=None):
+        """ Bind the texture of a gradient surface for the rects that follow, cached on the texture_holder """
+        # Handle texture creation/caching
+        texture = None
+        if texture_holder and hasattr(texture_holder, '_gl_texture') and texture_holder._gl_texture:
+            texture = texture_holder._gl_texture
+        
+        if texture is None:
+            rgba_data = pygame.image.tostring(gradient_image, "RGBA", False)
+            texture = self.ctx.texture(gradient_image.get_size(), 4, rgba_data)
+            
+            if texture_holder:
+                texture_holder._gl_texture = texture
+        
+        # Only flush and rebind if the texture has changed
+        if self.current_texture != texture:
+            self._push_batch()
+            self.current_texture = texture
+
+    def draw_rects(self, rects, colour0, colour1, softness=0.0, radius=0.0, stroke=0.0, segments=(0.0, 0.0), axis=1.0,
+                   level=10.0, additive=False, gradient_image=None, texture_holder=None):
+        """
+        Bulk draw_rect for a row of bars: rects is an (n, 4) array of x, y, w, h and colour0, colour1 the (n, 4) rgba
+        (0..1, gamma already applied) at the start and end of the gradient, which runs along axis as in add_rect.
+        softness, radius, stroke and level are scalars or (n,) arrays, empty rects are dropped as in add_rect
+        """
+        rects = np.asarray(rects, dtype='f4')
+        keep  = (rects[:, 2] > 0) & (rects[:, 3] > 0)
+        n     = int(np.count_nonzero(keep))
+        if n == 0:
+            return
+
+        self.set_additive(additive)
+        use_tex = 0.0
+        if gradient_image:
+            self.use_gradient_texture(gradient_image, texture_holder)
+            use_tex = 1.0
+
+        def per_rect(value):
+            return np.broadcast_to(value, keep.shape)[keep]
+
+        style = np.empty((n, 4), dtype='f4')
+        style[:, 0] = per_rect(softness)
+        style[:, 1] = per_rect(radius)
+        style[:, 2] = per_rect(stroke)
+        style[:, 3] = use_tex
+        shape = np.empty((n, 4), dtype='f4')
+        shape[:, 0:2] = segments
+        shape[:, 2]   = axis
+        shape[:, 3]   = per_rect(level)
+
+        along_u = 1.0 if abs(axis) >= 1.5 else 0.0
+        self.arena.rects(rects[keep], np.asarray(colour0)[keep], np.asarray(colour1)[keep], style, shape, gradient=along_u)
+
     def add_rect(self, coords, color, opacity, softness, stroke_width, radius, segments, gradient=None, axis=1.0, level=1.0, use_tex=0.0):
         """
-        Converts Pygame coords (x, y, w, h) to GL coords (-1 to 1)
-        and adds them to the batch queue.
+        Adds a Pygame rect (x, y, w, h) to the batch queue, the vertex shader
+        converts it to GL coords and pads it for softness.
         """
         x, y, w, h = coords
         
         if w <= 0 or h <= 0:
             return
         
-        # Calculate padding for softness to avoid clipping
-        padding = 0.0
-        if softness > 0.0:
-             # Match shader logic: float blur = v_softness * max(20.0, min_dim * 0.8);
-             min_dim = min(w, h)
-             blur_radius = softness * max(20.0, min_dim * 0.8)
-             padding = blur_radius * 1.5 + 10.0 # Standard safety margin
-
-        # Normalize to OpenGL Clip Space
-        sw, sh = self.platform.W, self.platform.H
-        
-        x1, y1 = ((x - padding) / sw) * 2 - 1, 1 - ((y - padding) / sh) * 2
-        x2, y2 = ((x + w + padding) / sw) * 2 - 1, 1 - ((y + h + padding) / sh) * 2
-        
         # Base color (default)
         r0, g0, b0 = [c/255.0 for c in color[:3]]
         a = opacity / 255.0
-        
-        # Initialize corner colors
-        c_tl = c_tr = c_bl = c_br = (r0, g0, b0)
+        c_start = c_end = (r0, g0, b0, a)
+        along_u = 0.0
 
         # Gradient colors
         if gradient:
             c_start, c_end = gradient
-            rs, gs, bs = [pow(c/255.0, 2.2) for c in c_start[:3]]
-            re, ge, be = [pow(c/255.0, 2.2) for c in c_end[:3]]
-            
-            if abs(axis) < 1.5: # Vertical Gradient (Top -> Bottom)
-                c_tl = c_tr = (rs, gs, bs)
-                c_bl = c_br = (re, ge, be)
-            else: # Horizontal Gradient (Left -> Right)
-                c_tl = c_bl = (rs, gs, bs)
-                c_tr = c_br = (re, ge, be)
-
-        s = softness
-        w_px, h_px = w, h
-        seg_w, seg_gap = segments
-
-        # UVs need to be adjusted so 0..1 maps to the original w,h
-        u_start = -padding / w
-        u_end = 1.0 + padding / w
-        v_start = -padding / h
-        v_end = 1.0 + padding / h
-
-        # Define two triangles (Standard GL Rect) with UVs, Softness, Size, Radius, Stroke, Segments, Axis, Level, UseTex
-        # Format: x, y, u, v, r, g, b, a, s, w, h, rad, stroke, seg_w, seg_gap, axis, level, use_tex
-        # Note: y1 is Top, y2 is Bottom in GL coords here (because of 1 - y calculation)
-        rect_data = [
-            x1, y1, u_start, v_start, c_tl[0], c_tl[1], c_tl[2], a, s, w_px, h_px, radius, stroke_width, seg_w, seg_gap, axis, level, use_tex, # Top-Left
-            x2, y1, u_end,   v_start, c_tr[0], c_tr[1], c_tr[2], a, s, w_px, h_px, radius, stroke_width, seg_w, seg_gap, axis, level, use_tex, # Top-Right
-            x1, y2, u_start, v_end,   c_bl[0], c_bl[1], c_bl[2], a, s, w_px, h_px, radius, stroke_width, seg_w, seg_gap, axis, level, use_tex, # Bottom-Left
+            c_start = (*[pow(c/255.0, 2.2) for c in c_start[:3]], a)
+            c_end   = (*[pow(c/255.0, 2.2) for c in c_end[:3]], a)
             
-            x1, y2, u_start, v_end,   c_bl[0], c_bl[1], c_bl[2], a, s, w_px, h_px, radius, stroke_width, seg_w, seg_gap, axis, level, use_tex, # Bottom-Left
-            x2, y1, u_end,   v_start, c_tr[0], c_tr[1], c_tr[2], a, s, w_px, h_px, radius, stroke_width, seg_w, seg_gap, axis, level, use_tex, # Top-Right
-            x2, y2, u_end,   v_end,   c_br[0], c_br[1], c_br[2], a, s, w_px, h_px, radius, stroke_width, seg_w, seg_gap, axis, level, use_tex  # Bottom-Right
-        ]
-        
-        if (len(self.render_queue) + len(rect_data)) * 4 > self.vbo.size:
-            self._push_batch()
-            
-        self.render_queue.extend(rect_data)
+            if abs(axis) >= 1.5: # Horizontal Gradient (Left -> Right), otherwise Vertical (Top -> Bottom)
+                along_u = 1.0
+
+        self.arena.rect(x, y, w, h, c_start, c_end, (softness, radius, stroke_width, use_tex), (*segments, axis, level), gradient=along_u)
 
     def draw_line(self, color, start_pos, end_pos, width=1, softness=0.0, **kwargs):
         """
@@ -832,68 +955,61 @@ class GeometryPass(RenderPass):
         ux = dx / length
         uy = dy / length
         
-        # Perpendicular vector (rotated 90 degrees) scaled by half width
-        px = -uy * width * 0.5
-        py = ux * width * 0.5
-        
-        # Calculate the 4 corners of the rotated rectangle
-        # Top-Left (Start + Perp)
-        x_tl, y_tl = x1 + px, y1 + py
-        # Top-Right (End + Perp)
-        x_tr, y_tr = x2 + px, y2 + py
-        # Bottom-Left (Start - Perp)
-        x_bl, y_bl = x1 - px, y1 - py
-        # Bottom-Right (End - Perp)
-        x_br, y_br = x2 - px, y2 - py
-
-        # Normalize to OpenGL Clip Space (-1 to 1)
-        sw, sh = self.platform.W, self.platform.H
-        
-        def to_gl(x, y):
-            return (x / sw) * 2 - 1, 1 - (y / sh) * 2
-
-        xtl, ytl = to_gl(x_tl, y_tl)
-        xtr, ytr = to_gl(x_tr, y_tr)
-        xbl, ybl = to_gl(x_bl, y_bl)
-        xbr, ybr = to_gl(x_br, y_br)
+        # The line is a length x width rect along the direction, starting half a width to the side of start_pos
+        ox = x1 + uy * width * 0.5
+        oy = y1 - ux * width * 0.5
 
         # Color and params
         r, g, b = [pow(c/255.0, 2.2) for c in color[:3]]
         a = (color[3]/255.0) if len(color) > 3 else 1.0
         
-        # Params: width (length of line), height (thickness), radius (0 for square ends), stroke (0 for filled)
-        # We map UVs so that U goes along length, V goes along thickness
-        
-        s = softness
-        # Vertices: x, y, u, v, r, g, b, a, s, w, h, rad, stroke, seg_w, seg_gap, axis, level, use_tex
-        # We use 2 triangles (TL, TR, BL) and (BL, TR, BR)
-        rect_data = [
-            xtl, ytl, 0.0, 0.0, r, g, b, a, s, length, width, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, # Top-Left
-            xtr, ytr, 1.0, 0.0, r, g, b, a, s, length, width, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, # Top-Right
-            xbl, ybl, 0.0, 1.0, r, g, b, a, s, length, width, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, # Bottom-Left
-            
-            xbl, ybl, 0.0, 1.0, r, g, b, a, s, length, width, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, # Bottom-Left
-            xtr, ytr, 1.0, 0.0, r, g, b, a, s, length, width, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, # Top-Right
-            xbr, ybr, 1.0, 1.0, r, g, b, a, s, length, width, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0  # Bottom-Right
-        ]
-        
-        if (len(self.render_queue) + len(rect_data)) * 4 > self.vbo.size:
-            self._push_batch()
-            
-        self.render_queue.extend(rect_data)
+        # U goes along length, V goes along thickness; radius 0 for square ends, stroke 0 for filled, no padding
+        colour = (r, g, b, a)
+        self.arena.rect(ox, oy, length, width, colour, colour, (softness, 0.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0),
+                        direction=(ux, uy), pad=0.0)
 
     def draw_lines(self, color, closed, points, width=1, softness=0.0):
         """
         Draws a sequence of connected lines.
         """
+        self.draw_polyline(color, points, width, softness, closed=closed)
+
+    def draw_polyline(self, color, points, width=1, softness=0.0, closed=False, joins='round', additive=False):
+        """
+        Draws a line through an (n, 2) array of points as one range of instances, one rotated rect per segment
+        built with numpy rather than a draw_line call each.
+        joins 'round' makes each segment a capsule (square rect extended and rounded by half the width) so the
+        segments overlap at the points without cracks, None gives the butt ends of draw_line
+        """
+        points = np.asarray(points, dtype=float)
         if len(points) < 2:
             return
-            
-        for i in range(len(points) - 1):
-            self.draw_line(color, points[i], points[i+1], width, softness)
-            
         if closed:
-            self.draw_line(color, points[-1], points[0], width, softness)
+            points = np.vstack((points, points[:1]))
+
+        self.set_additive(additive)
+
+        delta  = np.diff(points, axis=0)
+        length = np.hypot(delta[:, 0], delta[:, 1])
+        shown  = length >= 0.1      # Skip invisible segments
+        if not shown.any():
+            return
+        start, delta, length = points[:-1][shown], delta[shown], length[shown]
+        ux, uy = delta[:, 0] / length, delta[:, 1] / length
+
+        # As draw_line, each segment runs along its direction from half a width to the side of its start point
+        half   = width * 0.5
+        extend = half if joins == 'round' else 0.0
+        rect   = np.empty((len(length), 4), dtype='f4')
+        rect[:, 0] = start[:, 0] + uy * half - ux * extend
+        rect[:, 1] = start[:, 1] - ux * half - uy * extend
+        rect[:, 2] = length + 2.0 * extend
+        rect[:, 3] = width
+
+        r, g, b = [pow(c/255.0, 2.2) for c in color[:3]]
+        a = (color[3]/255.0) if len(color) > 3 else 1.0
+        self.arena.rects(rect, (r, g, b, a), (r, g, b, a), (softness, extend, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0),
+                         direction=np.column_stack((ux, uy)), pad=0.0)
 
     def render(self, **kwargs):
         """
@@ -901,6 +1017,14 @@ class GeometryPass(RenderPass):
         The output_target is already bound by the Compositor before this is called.
         """
         self._push_batch() # Push whatever is pending in the queue
+
+        # Every batch of the frame goes to the GPU in one write
+        records = self.arena.view()
+        if len(records) > self.vbo.size:
+            self.vbo.orphan(self.arena.data.nbytes)
+        if len(records):
+            self.vbo.write(records)
+        self.prog['screen'].value = (self.platform.W, self.platform.H)
         
         for batch in self.batches:
             if batch['type'] == 'geometry':
@@ -915,14 +1039,24 @@ class GeometryPass(RenderPass):
                     batch['texture'].use(location=0)
                     self.prog['gradient_tex'].value = 0
                 
-                # 3. Write Data & Render
-                data = np.array(batch['data'], dtype='f4')
-                self.vbo.write(data)
-                self.vao.render(moderngl.TRIANGLES, vertices=len(data)//18)
+                # 3. Render the batch's range of the frame's records, each an instance of the unit quad
+                self._bind_instances(batch['first'])
+                self.vao.render(moderngl.TRIANGLES, vertices=6, instances=batch['count'])
         
         # Reset for next frame
         self.batches = []
-        self.render_queue = []
+        self.arena.clear()
+        self.batch_start = 0
+
+    def _bind_instances(self, first):
+        """ Point the instance attributes at the records from first, as instanced draws cannot start part way """
+        if first == self.bound_first:
+            return
+        stride = self.arena.STRIDE
+        for name, fmt, offset in self.instance_attrs:
+            self.vao.bind(self.prog[name].location, 'f', self.vbo, fmt, offset=first * stride + offset,
+                          stride=stride, divisor=1)
+        self.bound_first = first
 
     def blit(self, source, dest, area=None, special_flags=0, **kwargs):
         """
@@ -957,7 +1091,7 @@ class GeometryPass(RenderPass):
             self._push_batch()
             self.current_texture = texture
 
-        # Calculate Normalized Device Coordinates
+        # Position in pixels, the vertex shader converts to GL coords
         if hasattr(dest, 'x'):
              x, y = dest.x, dest.y
         else:
@@ -968,13 +1102,6 @@ class GeometryPass(RenderPass):
         reflection = kwargs.get('reflection')
 
         w, h = source.get_size()
-        sw, sh = self.platform.W, self.platform.H
-        
-        # GL coords: -1 to 1. Y is up. Pygame Y is down.
-        x1 = (x / sw) * 2 - 1
-        y1 = 1 - (y / sh) * 2
-        x2 = ((x + w) / sw) * 2 - 1
-        y2 = 1 - ((y + h) / sh) * 2
         
         # Texture Coordinates (Support for Atlasing)
         # tex_coords = (u, v, uw, vh)
@@ -989,20 +1116,11 @@ class GeometryPass(RenderPass):
         # level = v_scale -> Repurposed for UV Scale Y
         # use_tex = 2.0 (Image Mode)
         
-        # Vertices: x, y, u, v, r, g, b, a, s, w, h, rad, stroke, seg_w, seg_gap, axis, level, use_tex
         # UVs for shape are 0..1 (standard quad)
-        
-        img_data = [
-            x1, y1, 0.0, 0.0, 1.0, 1.0, 1.0, opacity, 0.0, w, h, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0, # TL
-            x2, y1, 1.0, 0.0, 1.0, 1.0, 1.0, opacity, 0.0, w, h, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0, # TR
-            x1, y2, 0.0, 1.0, 1.0, 1.0, 1.0, opacity, 0.0, w, h, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0, # BL
-            
-            x1, y2, 0.0, 1.0, 1.0, 1.0, 1.0, opacity, 0.0, w, h, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0, # BL
-            x2, y1, 1.0, 0.0, 1.0, 1.0, 1.0, opacity, 0.0, w, h, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0, # TR
-            x2, y2, 1.0, 1.0, 1.0, 1.0, 1.0, opacity, 0.0, w, h, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0  # BR
-        ]
-        
-        self.render_queue.extend(img_data)
+        tint = (1.0, 1.0, 1.0, opacity)
+        image = (0.0, 0.0, 0.0, 2.0)
+        atlas = (u_off, v_off, u_scale, v_scale)
+        self.arena.rect(x, y, w, h, tint, tint, image, atlas, pad=0.0)
 
         # Draw Reflection if requested
         if reflection:
@@ -1012,23 +1130,9 @@ class GeometryPass(RenderPass):
                 ref_size = reflection.get('size', ref_size)
                 ref_opacity = reflection.get('opacity', ref_opacity)
             
-            # Reflection geometry (Below main image)
-            h_gl = y1 - y2
-            h_ref_gl = h_gl * ref_size
-            y1_ref = y2
-            y2_ref = y2 - h_ref_gl
-            
-            # Reflection uses flipped UVs (1.0 -> 0.0) for shape to mirror image
-            # Alpha gradient: Top (y1_ref) = ref_opacity, Bottom (y2_ref) = 0.0
-            
-            ref_data = [
-                x1, y1_ref, 0.0, 1.0, 1.0, 1.0, 1.0, ref_opacity, 0.0, w, h_ref_gl, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0,
-                x2, y1_ref, 1.0, 1.0, 1.0, 1.0, 1.0, ref_opacity, 0.0, w, h_ref_gl, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0,
-                x1, y2_ref, 0.0, 0.0, 1.0, 1.0, 1.0, 0.0,         0.0, w, h_ref_gl, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0,
-                
-                x1, y2_ref, 0.0, 0.0, 1.0, 1.0, 1.0, 0.0,         0.0, w, h_ref_gl, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0,
-                x2, y1_ref, 1.0, 1.0, 1.0, 1.0, 1.0, ref_opacity, 0.0, w, h_ref_gl, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0,
-                x2, y2_ref, 1.0, 0.0, 1.0, 1.0, 1.0, 0.0,         0.0, w, h_ref_gl, 0.0, 0.0, u_off, v_off, u_scale, v_scale, 2.0
-            ]
-            
-            self.render_queue.extend(ref_data)
\ No newline at end of file
+            # Reflection geometry (Below main image), running upwards from its bottom edge so the
+            # UVs are flipped (1.0 -> 0.0) to mirror the image
+            # Alpha gradient: Top = ref_opacity, Bottom = 0.0
+            h_ref = h * ref_size
+            fade, top = (1.0, 1.0, 1.0, 0.0), (1.0, 1.0, 1.0, ref_opacity)
+            self.arena.rect(x, y + h + h_ref, w, -h_ref, fade, top, image, atlas, pad=0.0)
@@ -543,8 +543,11 @@ class Frame(Geometry):
         scalers     is how the frame is scaled vs the boundary
         square      is to force the shape to have w=h
         padding     is a % additional scaling added to the absolute size is a smaller than the scaled size
+        requires    is the set of audio features the frame uses eg {'bins', 'vu', 'beat'}, see processaudio.AUDIO_FEATURES,
+                    a frame class that leaves it undeclared (None) is assumed to use them all
         
     """
+    requires = None
 
 
     def __init__(self, parent, scalers=FullScale, align=Centred, square=False, theme=None, background=None, outline=None, padding=0, z_order=0):
@@ -655,6 +658,20 @@ class Frame(Geometry):
     def handle_key(self, key):
         """ Override to handle key presses directed at this frame """
         pass
+
+    def required_features(self):
+        """ The union of the audio features required by this frame, its background and all its sub-frames """
+        if self.requires is not None:
+            features = set(self.requires)
+        elif type(self) is Frame:
+            features = set()        # a plain layout frame
+        else:
+            from pyvisualiser.core.processaudio import AUDIO_FEATURES
+            features = set(AUDIO_FEATURES)  # undeclared, so gating is opt in
+        features |= getattr(self.background_frame, 'requires', set())
+        for f in self.frames:
+            features |= f.required_features()
+        return features
             
     def framestr(self):
         return "%-10s > wh %s, abs %s, parent %s, %s, %s, %s %s" % (type(self).__name__, self.wh, self.abs_rect(), self.bounds, self.scalers, self.alignment, self.theme, self.align_offset)
@@ -711,6 +728,8 @@ class AxisFramer(Frame):
     Generic axis-based framer.  
     Handles layout along a single axis (x for columns, y for rows).
     """
+    requires = set()
+
     def __init__(self, parent, ratios=None, axis='x', padpc=0, **kwargs):
         super().__init__(parent, **kwargs)
         self.axis = axis  # 'x' for ColFramer, 'y' for RowFramer
@@ -942,7 +961,77 @@ class Smoother:
             return ave / (tot*0.9)  # this increased teh amplitude as the smoothing damps the range for VUs
 
     def __str__(self):
-        return f"Smoother> max={self.FrameHeight}, size={self.size}, smoother={self.smoother}"  
+        return f"Smoother> max={self.FrameHeight}, size={self.size}, smoother={self.smoother}"
+
+
+class SmootherBank:
+    """
+    A bank of Smoothers, one per bar, so a whole spectrum is smoothed with a few numpy operations a frame
+        - history is a (ave_size, bars) ring, each bar has its own head as bars only add when they need to
+        - smoothed() gives the same triangle (size 5) or weighted rectangle smoothing as Smoother
+        - track() applies the attack, decay and peak hold used by the spectrum, VU and oscillogramme bars
+    """
+    def __init__(self, bars, maximum=1.0, ave_size=5):
+        self.bars        = bars
+        self.size        = ave_size
+        self.FrameHeight = maximum
+        self.history     = np.zeros((ave_size, bars))
+        self.heads       = np.zeros(bars, dtype=np.intp)     # row of the newest value of each bar
+        self.cols        = np.arange(bars)
+        self.ages        = np.arange(ave_size)[:, None]
+        self.peaks       = np.zeros(bars)
+        self._smoothed   = None
+
+        if ave_size == 5:   # Triangle smoother, newest first
+            self.weights = np.array([1.0, 2.0, 3.0, 2.0, 1.0]) / 8
+        else:               # Rectangle smoother weighted to the newest, scaled up as the smoothing damps the range for VUs
+            inc          = np.arange(ave_size, 0, -1, dtype=np.float64)
+            self.weights = inc / (inc.sum()*0.9)
+
+    def __len__(self):
+        return self.bars
+
+    def add(self, data, mask=None):
+        """ Add a value (or array of values) to every bar, or only to the bars selected by mask """
+        data = np.broadcast_to(np.asarray(data, dtype=np.float64), (self.bars,))
+        if mask is None:
+            self.heads = (self.heads + 1) % self.size
+            self.history[self.heads, self.cols] = data
+        else:
+            self.heads[mask] = (self.heads[mask] + 1) % self.size
+            self.history[self.heads[mask], self.cols[mask]] = data[mask]
+        self._smoothed = None
+
+    def smoothed(self):
+        """ The smoothed level of every bar as an array """
+        if self._smoothed is None:
+            rows           = (self.heads - self.ages) % self.size     # (ave_size, bars) rows, newest first
+            self._smoothed = self.weights @ self.history[rows, self.cols]
+            if self.size == 5:
+                np.minimum(self._smoothed, self.FrameHeight, out=self._smoothed)
+        return self._smoothed
+
+    def track(self, targets, decay, peak_decay=None):
+        """
+        Decay work by assuming that all bars naturally decay at a fixed rate and manner (eg lin /log)
+        If the target height is greater than the current, the height immediately increases - per smoothing algorithm
+        Returns the heights before this frame's decay is applied, the peaks are held in self.peaks
+        """
+        self.add(targets, np.asarray(targets) > self.smoothed())
+
+        height = self.smoothed()
+        if peak_decay is not None:
+            np.maximum(self.peaks, height, out=self.peaks)
+
+        self.add(np.where(height < decay/100.0, 0.0, height * (1 - decay)))
+
+        if peak_decay is not None:
+            self.peaks[self.smoothed() < decay/3.0] = 0.0     # Look for when its gone quiet to clear the peak bars
+            self.peaks *= (1 - peak_decay)
+        return height
+
+    def __str__(self):
+        return f"SmootherBank> bars={self.bars}, max={self.FrameHeight}, size={self.size}"
 
 def get_asset_path(category: str, filename: str) -> str:
     """
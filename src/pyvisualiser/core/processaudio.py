@@ -18,12 +18,15 @@ from scipy.stats import lognorm
 
 import  time, math, os
 import  numpy as np
-from    scipy.fft import rfft
-from    scipy.signal import butter, lfilter
+from    scipy.fft import rfft, next_fast_len
+from    scipy.sparse import csr_matrix
+from    scipy.signal import butter, lfilter, sosfilt, firwin
+from    numpy.lib.stride_tricks import sliding_window_view
 import  pyaudio
 import  wave
 from    queue import Queue, Empty, Full
 from    events import Events
+from    pyvisualiser.core.audiosource import make_source, AUDIO_FORMATS
 
 
 # constants
@@ -37,28 +40,59 @@ CRITICAL_TIME_MS = (FRAME / RATE) * 1000
 maxValue        = float(2**15)
 SAMPLEPERIOD    = FRAMESIZE/RATE
 SMOOTHFACTOR    = 0
-AUDIO_QUEUE_MAXSIZE = 10  # Max number of audio frames to queue
+AUDIO_QUEUE_MAXSIZE = 10  # Max number of audio blocks held in the capture ring buffer
+CAPTURE_FRAMES  = FRAMESIZE  # frames per capture buffer, eg 256 with a hop for the low latency STFT mode
+STFT_HOP        = None       # frames between analysis frames, None analyses each capture buffer as it arrives
 
 SILENCESAMPLES  = 7   / SAMPLEPERIOD  #7 seconds worth of samples
 PEAKSAMPLES     = 0.7 / SAMPLEPERIOD  #0.5 seconds worth of VU measurements
 VUSAMPLES       = 0.25 / SAMPLEPERIOD  #0.3 seconds is the ANSI VU standard
 
 RECORDSTATE     = False
-RECORDTIME      = 30 * 60 / SAMPLEPERIOD / CHANNELS # failfase to stop the disk filling up
+RECORDTIME      = 30 * 60   # seconds, failsafe to stop the disk filling up
+RECORD_QUEUE_SIZE = 32      # blocks buffered between the capture and the recording writer thread
 RECORDPATH      = "/home/pi/preDAC/rec/"
 RECORDFILESUFFIX = "preDAC"
 RECORDINGS_PATTERN = RECORDPATH + RECORDFILESUFFIX + "-%s.wav"
 
 WINDOW          = 12 #12 # 4 = Hanning
 FIRSTCENTREFREQ = 10 #31.25        # Hz
-LASTCENTREFREQ  = RATE // 3 # ie about 13.5kHz
+LASTCENTREFREQ  = RATE // 3 # ie about 14.7kHz, AudioConfig.lastcentrefreq at other rates
 OCTAVE          = 3
 NUMPADS         = FRAME
 BINBANDWIDTH    = RATE/(FRAME + NUMPADS) #ie 43.5 Hz for 44.1kHz/1024
 DCOFFSETSAMPLES = 200
+FFT_WORKERS     = None   # threads used by scipy.fft, None is single threaded, -1 uses every core
+LOWBAND_DECIMATE  = 8     # decimation of the low band stream for the multi-resolution analysis
+LOWBAND_FFT       = 2048  # FFT size of the decimated low band, ie 2.7Hz bins at 44.1kHz/8 - as fine as a 16k FFT
+LOWBAND_CROSSOVER = 400   # Hz, bands up to here are packed from the low band FFT, above from the main FFT
+LOWBAND_CHANNELS  = ('low_left', 'low_right', 'low_mono')   # keys of the low band magnitudes in the bins dict
 TWOPI           = 2*3.14152
 
 VUGAIN          = 0.06
+
+# Meter ballistics, see MeterBallistics.  The vu dict holds the VU of each channel and, with ballistics, the PPM and sample peak
+VU_TIME         = 0.3    # seconds for the VU to reach 99% of a step
+PPM_ATTACK      = 0.01   # seconds for the PPM to reach 80% of a tone burst
+PPM_RELEASE     = 2.8    # seconds for the PPM to fall 20dB (BBC/EBU type II)
+PEAK_RELEASE    = 1.7    # seconds for the sample peak to fall 20dB
+METER_CHANNELS  = ('left', 'right', 'mono', 'ppm_left', 'ppm_right', 'ppm_mono', 'peak_left', 'peak_right', 'peak_mono')
+
+# EBU R128 loudness, see LoudnessMeter.  With the loudness feature the vu dict also holds these, in LUFS and dBTP
+LOUDNESS_CHANNELS = ('lufs_momentary', 'lufs_short_term', 'lufs_integrated', 'true_peak', 'true_peak_max')
+LEVEL_CHANNELS  = METER_CHANNELS + LOUDNESS_CHANNELS
+LOUDNESS_FLOOR  = -70.0  # LUFS, the absolute gate, also reported for silence
+LOUDNESS_HISTORY = 3600  # seconds of gating blocks kept for the integrated loudness
+
+# Audio features a Frame can declare in its requires set, so the pipeline only computes what the active screen uses
+#   bins     - left/right/mono FFT magnitudes (packFFT, spectrum frames)
+#   vu       - VU levels (always computed as silence detection needs them)
+#   bass     - smoothed bass energy, needs bins
+#   treble   - smoothed treble energy, needs bins
+#   beat     - aubio tempo/beat tracking (trigger_detected, audioanalysis beat & bpm)
+#   analysis - aubio spectral descriptors (audioanalysis centroid, kurtosis, flux, volume)
+#   loudness - EBU R128 momentary, short term and integrated LUFS and the true peak, in the vu dict
+AUDIO_FEATURES  = frozenset(('bins', 'vu', 'bass', 'treble', 'beat', 'analysis', 'loudness'))
 RMSNOISEFLOOR   = -70    # dB
 DYNAMICRANGE    = 50     # Max dB
 SILENCETHRESOLD = 0.001   #0.02   # Measured from VU Noise Floor + VU offset
@@ -69,28 +103,761 @@ VURange   = DYNAMICRANGE - 20
 PeakOff   = -(RMSNOISEFLOOR + 10) # lower limit to display
 VUOff     = -(RMSNOISEFLOOR + 10) # was 40
 
+class AudioConfig:
+    """
+    The sample rate, frame size and sample format of the audio, and every DSP constant derived from them, so that
+    hi-res streams (48k/96k/192k, 24/32 bit or float) are analysed natively without resampling.
+    The module constants above are the values of the default AudioConfig()
+        - frame defaults to FRAME scaled with the rate to the nearest power of 2, keeping ~21Hz FFT bins and a ~23ms window
+        - format is a key of AUDIO_FORMATS: 'int16', 'int24' (widened to int32), 'int32' or 'float32'
+        - the samples stay in the format's dtype, fullscale normalises them
+        - fast_len pads the FFT to scipy's next_fast_len, for frames that are not a power of 2
+        - the DSP runs in float32 whatever the format, the loudness integrator keeps its own float64
+    """
+    def __init__(self, rate=RATE, frame=None, channels=CHANNELS, format='int16', fast_len=False):
+        self.rate         = int(rate)
+        self.frame        = int(frame or 2**round(math.log2(FRAME * self.rate / RATE)))
+        self.channels     = channels
+        self.format       = format
+        self.dtype, self.fullscale, self.sampwidth, self.paformat = AUDIO_FORMATS[format]
+
+        self.framesize    = self.frame * channels         # frames per capture block
+        self.numpads      = self.frame
+        self.fast_len     = fast_len
+        self.nfft         = next_fast_len(self.frame + self.numpads, real=True) if fast_len else self.frame + self.numpads
+        self.bins         = self.nfft//2 + 1
+        self.binbandwidth = self.rate / self.nfft
+        self.sampleperiod = self.framesize / self.rate
+        self.float_dtype  = np.float32      # DSP precision, a 24 bit mantissa is ample for the display
+        self.lastcentrefreq = self.rate // 3  # top of the band tables, ie about 14.7kHz at 44.1kHz
+
+        # recordings are PCM, float samples are written as 32 bit
+        self.record_sampwidth = 2 if self.dtype == np.int16 else 4
+
+        # Bass below 300Hz, treble above 3kHz, eg 14 and 140 at 44.1kHz
+        self.bass_bin     = self.bin(300)
+        self.treble_bin   = self.bin(3000)
+
+    def bin(self, freq):
+        """ The first FFT bin at or above freq """
+        return int(math.ceil(freq / self.binbandwidth))
+
+    @property
+    def key(self):
+        return (self.rate, self.frame, self.channels, self.format, self.fast_len)
+
+    def __str__(self):
+        return "AudioConfig> %dHz %s, %d frame FFT padded to %d, %.1fHz bins" % (self.rate, self.format, self.frame, self.nfft, self.binbandwidth)
+
+DEFAULT_CONFIG  = AudioConfig()     # the defaults of the band plans and shared state when no config is given
+
+
 class WindowAve:
-    """ Class to find the moving average of a set of window of points """
+    """ Class to find the moving average of a set of window of points, kept as a ring with a running sum """
     def __init__(self, size):
-        self.window = [1.0]*int(size)
-        self.size   = int(size)
+        self.size   = max(1, int(size))
+        self.reset('signal')
 
     def average(self, data):
-        #add the data point to the window
-        self.window.insert(0, data)
-        del self.window[-1]
-        return sum(self.window)/len(self.window)
+        #replace the oldest data point in the window
+        self.total += data - self.window[self.head]
+        self.window[self.head] = data
+        self.head = (self.head + 1) % self.size
+        if self.head == 0:
+            self.total = sum(self.window)   # stop rounding errors accumulating in the running sum
+        return self.total/self.size
 
     def reset(self,type):
         if type == 'silence':
-            self.window = [0.0]*int(self.size)
+            self.window = [0.0]*self.size
+        else:
+            self.window = [1.0]*self.size
+        self.total  = sum(self.window)
+        self.head   = 0
+
+
+class AudioRingBuffer:
+    """
+    Single producer / single consumer ring of audio blocks held in one preallocated int16 array
+        - the producer (PortAudio callback) copies the raw bytes into the next slot, it never blocks or allocates
+        - the consumer reads zero-copy views of the oldest unread block
+        - if the consumer falls behind, the oldest blocks are dropped (overrun) so the latest audio is always kept
+        - lock free: each counter is only advanced by one side and the GIL makes the int updates atomic
+
+    A view returned by read() stays valid until the producer laps the ring, ie for blocks-1 further writes
+    """
+    def __init__(self, blocks=AUDIO_QUEUE_MAXSIZE, blocksize=FRAMESIZE*CHANNELS, dtype=np.int16):
+        self.blocks      = int(blocks)
+        self.blocksize   = int(blocksize)
+        self.buffer      = np.zeros((self.blocks, self.blocksize), dtype=dtype)
+        self.lengths     = np.zeros(self.blocks, dtype=np.int64)   # samples written into each slot
+        self.itemsize    = self.buffer.itemsize
+        self._bytes      = memoryview(self.buffer).cast('B')        # flat byte view to copy raw callback data into
+
+        self.write_count = 0    # only advanced by the producer
+        self.read_count  = 0    # only advanced by the consumer
+        self.overruns    = 0    # blocks dropped because the consumer was too slow
+        self.empty_reads = 0    # polls that found no new block, normal while the consumer is ahead of the audio
+
+    @property
+    def available(self):
+        return min(self.write_count - self.read_count, self.blocks - 1)
+
+    def write(self, data):
+        """ Producer side: copy one block of raw interleaved samples (bytes or buffer) into the ring """
+        data   = memoryview(data).cast('B')     # bytes from PyAudio, or a numpy block from the other sources
+        slot   = self.write_count % self.blocks
+        nbytes = min(len(data), self.blocksize * self.itemsize)
+        start  = slot * self.blocksize * self.itemsize
+        if nbytes < len(data):
+            data = data[:nbytes]
+
+        self._bytes[start:start+nbytes] = memoryview(data).cast('B')
+        self.lengths[slot] = nbytes // self.itemsize
+        self.write_count  += 1      # publish the block only once it is complete
+
+    def read(self):
+        """ Consumer side: return a view of the oldest unread block, or None if there is nothing new """
+        unread = self.write_count - self.read_count
+        if unread <= 0:
+            self.empty_reads += 1
+            return None
+
+        if unread >= self.blocks:
+            # The producer has lapped the reader (or is writing into the oldest slot) - drop the oldest blocks
+            dropped          = unread - (self.blocks - 1)
+            self.overruns   += dropped
+            self.read_count += dropped
+
+        slot = self.read_count % self.blocks
+        self.read_count += 1
+        return self.buffer[slot, :self.lengths[slot]]
+
+    def reset(self):
+        self.read_count = self.write_count
+
+    def __str__(self):
+        return "AudioRingBuffer> %d/%d blocks queued, overruns %d, empty reads %d" % (self.available, self.blocks, self.overruns, self.empty_reads)
+
+class SlidingWindow:
+    """
+    Streaming front end for the low latency overlapping STFT mode
+        - small capture blocks are shifted into a window holding the most recent `frames` interleaved frames
+        - an analysis frame is due once `hop` new frames have arrived, so the spectrum and VU update at RATE/hop
+          whatever the capture buffer or FFT size
+        - if the consumer is slower than the hop, the intermediate frames are skipped and the latest window is used
+
+    The window returned by frame() is overwritten by the next push(), so copy it if it has to outlive that
+    """
+    def __init__(self, frames=FRAMESIZE, hop=FRAME//4, channels=CHANNELS, dtype=np.int16):
+        self.frames   = int(frames)
+        self.hop      = int(hop)
+        self.channels = channels
+        self.buffer   = np.zeros(self.frames * channels, dtype=dtype)
+        self.pending  = 0       # frames received since the last analysis frame
+        self.skipped  = 0       # hops not analysed because the consumer was behind
+
+    @property
+    def ready(self):
+        return self.pending >= self.hop
+
+    def push(self, block):
+        """ Shift one interleaved block into the end of the window """
+        n = len(block)
+        if n >= len(self.buffer):
+            self.buffer[:] = block[-len(self.buffer):]
         else:
-            self.window = [1.0]*int(self.size)
+            self.buffer[:-n] = self.buffer[n:]
+            self.buffer[-n:] = block
+        self.pending += n // self.channels
+
+    def frame(self):
+        """ Return the current window and start waiting for the next hop """
+        self.skipped += self.pending // self.hop - 1
+        self.pending  = 0
+        return self.buffer
+
+    def __str__(self):
+        return "SlidingWindow> %d frames, hop %d, %d hops skipped" % (self.frames, self.hop, self.skipped)
+
+class BandPlan:
+    """
+    The FFT bin ranges of a set of bands, worked out once from the upper band frequencies returned by createBands
+        - starts/stops are the [start, stop) bin indices of each band, starting at bin 1 to skip DC
+        - pack() averages each band with one np.add.reduceat rather than a Python loop per band
+    """
+    def __init__(self, intervalUpperF, nbins=DEFAULT_CONFIG.bins, bandwidth=DEFAULT_CONFIG.binbandwidth, startbin=1):
+        self.intervalUpperF = list(intervalUpperF)
+        starts, stops = [], []
+
+        # startbin is 1 by default, do not use bin[0] which is DC
+        for band in self.intervalUpperF:
+            bincount = startbin
+            while bincount*bandwidth <= band:
+                bincount += 1
+            starts.append(startbin)
+            stops.append(bincount)
+            startbin = bincount
+
+        # clip to the bins available, a band beyond Nyquist just repeats the top bin
+        self.starts  = np.minimum(np.array(starts, dtype=np.intp), nbins-1)
+        self.stops   = np.clip(np.array(stops, dtype=np.intp), self.starts+1, nbins)
+        self.counts  = (self.stops - self.starts).astype(np.float64)
+        self.bands   = len(self.starts)
+        self.contiguous = bool(np.all(self.starts[1:] == self.stops[:-1]))
+
+    def __len__(self):
+        return self.bands
+
+    def pack(self, bins):
+        """ Return the mean of the bins in each band """
+        if self.bands == 0:
+            return np.zeros(0)
+        if self.contiguous:
+            # each band ends where the next starts, so reduceat sums each band in one call
+            sums = np.add.reduceat(bins[:self.stops[-1]], self.starts)
+        else:
+            csum = np.concatenate(([0.0], np.cumsum(bins)))
+            sums = csum[self.stops] - csum[self.starts]
+        return sums / self.counts
+
+    def __str__(self):
+        return "BandPlan> %d bands over bins %d..%d" % (self.bands, self.starts[0] if self.bands else 0, self.stops[-1] if self.bands else 0)
+
+
+class MultiResolutionPlan:
+    """
+    A band plan split at the LowBandFFT crossover: the bands up to the crossover are packed from the fine low band
+    bins, the rest from the main FFT bins starting just above the last low band
+    """
+    def __init__(self, intervalUpperF, nbins, lowband, bandwidth=DEFAULT_CONFIG.binbandwidth):
+        self.intervalUpperF = list(intervalUpperF)
+        split     = sum(1 for f in self.intervalUpperF if f <= lowband.crossover)
+        lows      = self.intervalUpperF[:split]
+        self.low  = BandPlan(lows, lowband.bins, lowband.bandwidth)
+        self.high = BandPlan(self.intervalUpperF[split:], nbins, bandwidth, startbin=int(lows[-1]/bandwidth) + 1 if lows else 1)
+        self.bands = len(self.intervalUpperF)
+
+    def __len__(self):
+        return self.bands
+
+    def pack(self, bins, lowbins):
+        """ Return the mean of the bins in each band, the low bands from lowbins """
+        return np.concatenate((self.low.pack(lowbins), self.high.pack(bins)))
+
+    def __str__(self):
+        return "MultiResolutionPlan> %d low + %d high bands" % (self.low.bands, self.high.bands)
+
+
+class ConstantQPlan:
+    """
+    Log frequency band engine, an alternative to averaging linear bins in BandPlan.  Each band is a triangular filter
+    from the centre of the band below to the centre of the band above, so the bands overlap smoothly and keep a
+    constant Q. A band narrower than the bin spacing interpolates between the bins either side of its centre
+    rather than being empty or repeating a bin
+        - the filters are built once per band plan into a scipy.sparse kernel, with each row normalised to sum to 1
+        - pack() applies it to the left and right channels in one sparse matmul, mono is their average
+        - with a LowBandFFT the kernel runs over the low band bins up to the crossover then the main FFT bins
+    """
+    def __init__(self, intervalUpperF, nbins, lowband=None, bandwidth=DEFAULT_CONFIG.binbandwidth):
+        self.intervalUpperF = list(intervalUpperF)
+        self.bands = len(self.intervalUpperF)
+        freqs      = np.arange(nbins) * bandwidth
+
+        self.low   = 0      # low band bins used
+        self.first = 0      # first main FFT bin used
+        if lowband is not None:
+            lowfreqs   = np.arange(lowband.bins) * lowband.bandwidth
+            self.low   = int(np.searchsorted(lowfreqs, lowband.crossover, side='right'))
+            self.first = int(np.searchsorted(freqs, lowband.crossover, side='right'))
+            freqs      = np.concatenate((lowfreqs[:self.low], freqs[self.first:]))
+        self.input = np.zeros((len(freqs), 2))
+
+        rows, cols, weights = [], [], []
+        if self.bands:
+            uppers  = np.asarray(self.intervalUpperF, dtype=float)
+            ratio   = uppers[1]/uppers[0] if self.bands > 1 else 2.0
+            lowers  = np.concatenate(([uppers[0]/ratio], uppers[:-1]))
+            centres = np.sqrt(lowers * uppers)
+            below   = np.concatenate(([lowers[0]], centres[:-1]))
+            above   = np.concatenate((centres[1:], [uppers[-1]]))
+
+            for band, (lo, centre, hi) in enumerate(zip(below, centres, above)):
+                cols_b = np.nonzero((freqs > lo) & (freqs < hi))[0]
+                if len(cols_b):
+                    f = freqs[cols_b]
+                    w = np.where(f <= centre, (f - lo)/(centre - lo), (hi - f)/(hi - centre))
+                else:
+                    # narrower than a bin: interpolate the bins either side of the centre, skipping DC
+                    j      = int(np.clip(np.searchsorted(freqs, centre), 2, len(freqs)-1))
+                    frac   = np.clip((centre - freqs[j-1]) / (freqs[j] - freqs[j-1]), 0.0, 1.0)
+                    cols_b = np.array([j-1, j])
+                    w      = np.array([1.0 - frac, frac])
+                rows.append(np.full(len(cols_b), band))
+                cols.append(cols_b)
+                weights.append(w / max(w.sum(), 1e-12))
+
+        self.kernel = csr_matrix((np.concatenate(weights) if weights else [], (np.concatenate(rows) if rows else [], np.concatenate(cols) if cols else [])),
+                                 shape=(self.bands, len(freqs)))
+
+    def __len__(self):
+        return self.bands
+
+    def pack(self, bins):
+        """ Return the band levels of every channel in the bins dict, as a dict of left, right and mono arrays """
+        if self.low:
+            self.input[:self.low, 0] = bins['low_left'][:self.low]
+            self.input[:self.low, 1] = bins['low_right'][:self.low]
+        n = len(self.input) - self.low
+        self.input[self.low:, 0] = bins['left'][self.first:self.first+n]
+        self.input[self.low:, 1] = bins['right'][self.first:self.first+n]
+
+        packed = self.kernel @ self.input
+        return {'left': packed[:, 0], 'right': packed[:, 1], 'mono': packed.mean(axis=1)}
+
+    def __str__(self):
+        return "ConstantQPlan> %d bands, %d kernel weights over %d bins" % (self.bands, self.kernel.nnz, self.kernel.shape[1])
+
+
+class StereoFFT:
+    """
+    Windowed, zero padded real FFT of the left and right channels in a single scipy.fft.rfft over a (2, N) array
+        - the window and the (2, N) windowed input are allocated once and refilled in place each frame
+        - magnitudes are written into a small rotating pool of (3, bins) arrays holding left, right and mono,
+          so results handed to the render thread by the inline DSP are not overwritten while they may still be read,
+          the AudioWorker copies them into each snapshot as it cannot bound how long a snapshot is held
+        - workers is passed through to scipy.fft, nfft comes from the AudioConfig (see its fast_len)
+    """
+    def __init__(self, size=FRAME, nfft=FRAMESIZE//2 + NUMPADS, workers=FFT_WORKERS, pool=4, fullscale=maxValue, dtype=np.float64):
+        self.size     = size
+        self.nfft     = nfft
+        self.workers  = workers
+        self.window   = np.kaiser(size, WINDOW).astype(dtype)
+        self.windowed = np.zeros((2, size), dtype=dtype)     # float32 input is transformed in single precision
+        self.bins     = self.nfft//2 + 1
+        self.pool     = [np.zeros((3, self.bins), dtype=dtype) for _ in range(pool)]
+        self.next     = 0
+        self.spectrum = None    # the complex spectra of the last transform, a new array from each rfft
+
+        # The magnitude of an rfft bin for a pure sine wave of amplitude A is (A * N / 2), where N is the number of samples (FRAME).
+        # To normalize a bin to ~1.0 for a full-scale sine wave, we divide by (fullscale * FRAME / 2).
+        self.scale    = 1.0 / (fullscale * (size / 2.0))
+
+    def transform(self, left, right):
+        """ Return the normalised magnitude spectra as a dict of left, right and mono (the average) arrays """
+        # the most recent samples are analysed, which is what the sliding window mode relies on
+        n = min(len(left), len(right), self.size)
+        np.multiply(left[len(left)-n:],   self.window[:n], out=self.windowed[0, :n])
+        np.multiply(right[len(right)-n:], self.window[:n], out=self.windowed[1, :n])
+        if n < self.size:
+            self.windowed[:, n:] = 0.0
+
+        spectrum = rfft(self.windowed, n=self.nfft, axis=-1, workers=self.workers)
+        self.spectrum = spectrum    # kept for the SpectralAnalyser
+
+        mags      = self.pool[self.next]
+        self.next = (self.next + 1) % len(self.pool)
+        np.abs(spectrum, out=mags[:2])
+        mags[:2] *= self.scale
+        np.add(mags[0], mags[1], out=mags[2])
+        mags[2]  *= 0.5
+
+        return {'left': mags[0], 'right': mags[1], 'mono': mags[2]}
+
+
+class LowBandFFT:
+    """
+    Multi-resolution analysis of the bass: a longer FFT over a decimated low band stream, merged with the main FFT
+    by MultiResolutionPlan, gives the resolution of a 16k FFT below the crossover for a fraction of the CPU
+        - every captured block is low pass filtered with sosfilt, keeping the filter state per channel between
+          blocks, then every decimate'th sample is kept, carrying the phase across blocks
+        - the decimated samples are shifted into a history of size samples which is windowed and transformed
+          in one rfft over the (2, size) array, scaled as StereoFFT so the levels match across the crossover
+    """
+    def __init__(self, decimate=LOWBAND_DECIMATE, size=LOWBAND_FFT, crossover=LOWBAND_CROSSOVER, rate=RATE, workers=FFT_WORKERS, pool=4, fullscale=maxValue, channels=CHANNELS):
+        self.decimate  = int(decimate)
+        self.channels  = channels
+        self.size      = int(size)
+        self.rate      = rate / self.decimate
+        self.bandwidth = self.rate / self.size
+        self.crossover = crossover
+        self.workers   = workers
+
+        # anti alias well below the new Nyquist, only the bands up to the crossover are used
+        cutoff         = min(2*crossover, 0.8*self.rate/2)
+        self.sos       = butter(8, cutoff, btype='lowpass', fs=rate, output='sos')
+        self.zi        = np.zeros((self.sos.shape[0], channels, 2))
+        self.phase     = 0      # index of the next sample to keep in the next block
+
+        self.history   = np.zeros((channels, self.size))
+        self.window    = np.kaiser(self.size, WINDOW)
+        self.windowed  = np.zeros((channels, self.size))
+        self.bins      = self.size//2 + 1
+        self.scale     = 1.0 / (fullscale * (self.size / 2.0))
+        self.pool      = [np.zeros((3, self.bins)) for _ in range(pool)]
+        self.next      = 0
+
+    @property
+    def key(self):
+        return (self.decimate, self.size, self.crossover, self.rate)
+
+    def push(self, data):
+        """ Filter and decimate one interleaved int16 block into the history """
+        stereo            = data.reshape(-1, self.channels).T
+        filtered, self.zi = sosfilt(self.sos, stereo, axis=-1, zi=self.zi)
+        kept              = filtered[:, self.phase::self.decimate]
+        self.phase        = (self.phase - stereo.shape[1]) % self.decimate
+
+        n = min(kept.shape[1], self.size)
+        if n == 0:
+            return      # a block shorter than the decimation kept no samples
+        self.history[:, :-n] = self.history[:, n:]
+        self.history[:, -n:] = kept[:, -n:]
+
+    def transform(self):
+        """ Return the normalised low band magnitude spectra keyed by LOWBAND_CHANNELS """
+        np.multiply(self.history, self.window, out=self.windowed)
+        spectrum  = rfft(self.windowed, axis=-1, workers=self.workers)
+
+        mags      = self.pool[self.next]
+        self.next = (self.next + 1) % len(self.pool)
+        np.abs(spectrum, out=mags[:2])
+        mags[:2] *= self.scale
+        np.add(mags[0], mags[1], out=mags[2])
+        mags[2]  *= 0.5
+
+        return dict(zip(LOWBAND_CHANNELS, mags))
+
+    def reset(self):
+        self.zi[:]      = 0.0
+        self.history[:] = 0.0
+
+    def __str__(self):
+        return "LowBandFFT> /%d, %d point FFT, %.1fHz bins up to %dHz" % (self.decimate, self.size, self.bandwidth, self.crossover)
+
+
+class MeterBallistics:
+    """
+    Meter ballistics computed at audio rate on every captured block, so needles behave the same whatever the frame rate
+    or queue depth, for the left, right and mono channels in one (3, n) array
+        - VU: the squared samples through a one pole IIR (lfilter with persistent zi) reaching 99% in VU_TIME
+        - PPM: quasi peak, the rectified samples held with a release of 20dB in PPM_RELEASE, then through a PPM_ATTACK IIR
+        - sample peak: the rectified samples with a release of 20dB in PEAK_RELEASE
+    The release is vectorised: y[k] = d^k * max(y[-1]*d, cummax(x[j] * d^-j)), with the powers of d precomputed.
+    read() decimates to one value per analysis frame: the VU at the end of the audio, the PPM and sample peak as the
+    maxima since the last read.  Levels use the rmsVU scale, the peaks are sine calibrated so a steady tone reads the same
+    """
+    def __init__(self, rate=RATE, channels=CHANNELS, fullscale=maxValue, vu_time=VU_TIME, ppm_attack=PPM_ATTACK,
+                 ppm_release=PPM_RELEASE, peak_release=PEAK_RELEASE):
+        self.channels   = channels
+
+        a               = math.exp(-math.log(100) / (vu_time * rate))
+        self.vu_filter  = ([1 - a], [1, -a])
+        a               = math.exp(-math.log(5) / (ppm_attack * rate))
+        self.ppm_filter = ([1 - a], [1, -a])
+        self.ppm_decay  = 10 ** (-1.0 / (ppm_release * rate))
+        self.peak_decay = 10 ** (-1.0 / (peak_release * rate))
+
+        self.vu_zi      = np.zeros((3, 1))
+        self.ppm_zi     = np.zeros((3, 1))
+        self.ppm_hold   = np.zeros(3)      # release state at the end of the last block
+        self.ppm_last   = np.zeros(3)      # quasi peak at the end of the last block
+        self.peak_hold  = np.zeros(3)
+        self.ppm_max    = np.zeros(3)      # maxima since the last read
+        self.peak_max   = np.zeros(3)
+        self.ms         = np.zeros(3)      # mean square at the end of the last block
+        self.powers     = {}               # (decay, block length) -> (d^k, d^-k)
+
+        self.vu_scale   = 1.0 / (fullscale * VUGAIN)
+        self.peak_scale = 1.0 / (fullscale * VUGAIN * math.sqrt(2))
+        self.x          = np.zeros((3, 0))
+
+    def _release(self, x, hold, decay):
+        """ Peak hold with an exponential release over the block, returns the held envelope """
+        n = x.shape[1]
+        if (decay, n) not in self.powers:
+            k = np.arange(n)
+            self.powers[(decay, n)] = (decay ** k, decay ** -k)
+        down, up = self.powers[(decay, n)]
+
+        y = np.maximum.accumulate(x * up, axis=1)
+        np.maximum(y, (hold * decay)[:, None], out=y)
+        y *= down
+        return y
+
+    def push(self, data):
+        """ Run one interleaved block through the meters """
+        frames = data.reshape(-1, self.channels)
+        if self.x.shape[1] != len(frames):
+            self.x = np.zeros((3, len(frames)))
+        x = self.x
+        x[:2] = frames[:, :2].T
+        np.add(x[0], x[1], out=x[2])
+        x[2] *= 0.5
+
+        ms, self.vu_zi = lfilter(*self.vu_filter, np.square(x), axis=1, zi=self.vu_zi)
+        self.ms        = ms[:, -1]
+
+        np.abs(x, out=x)
+        peak            = self._release(x, self.peak_hold, self.peak_decay)
+        self.peak_hold  = peak[:, -1]
+        held            = self._release(x, self.ppm_hold, self.ppm_decay)
+        self.ppm_hold   = held[:, -1]
+        qp, self.ppm_zi = lfilter(*self.ppm_filter, held, axis=1, zi=self.ppm_zi)
+        self.ppm_last   = qp[:, -1]
+
+        np.maximum(self.ppm_max, qp.max(axis=1), out=self.ppm_max)
+        np.maximum(self.peak_max, peak.max(axis=1), out=self.peak_max)
+
+    def read(self):
+        """ Return the meter levels keyed by METER_CHANNELS and start the next maxima """
+        levels = np.concatenate((np.sqrt(self.ms) * self.vu_scale, self.ppm_max * self.peak_scale, self.peak_max * self.peak_scale))
+        self.ppm_max[:]  = self.ppm_last
+        self.peak_max[:] = self.peak_hold
+        return dict(zip(METER_CHANNELS, np.minimum(levels, 1.0).tolist()))
+
+    def reset(self):
+        for state in (self.vu_zi, self.ppm_zi, self.ppm_hold, self.ppm_last, self.peak_hold, self.ppm_max, self.peak_max, self.ms):
+            state[:] = 0.0
+
+
+def k_weighting(rate):
+    """
+    The ITU-R BS.1770 K-weighting filter as second order sections for any sample rate: the high shelf modelling the head
+    then the RLB high pass.  The analogue prototypes are matched to the published 48kHz coefficients (as libebur128)
+    """
+    f0, gain, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k   = math.tan(math.pi * f0 / rate)
+    vh  = 10 ** (gain / 20)
+    vb  = vh ** 0.4996667741545416
+    a0  = 1 + k / q + k * k
+    shelf = [(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0,
+             1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k   = math.tan(math.pi * f0 / rate)
+    a0  = 1 + k / q + k * k
+    highpass = [1.0, -2.0, 1.0, 1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]
+    return np.array([shelf, highpass])
+
+
+class LoudnessMeter:
+    """
+    EBU R128 loudness measured incrementally on every captured block
+        - K-weighting with sosfilt, its state carried between blocks
+        - the weighted energy summed into 100ms sub-blocks, a 400ms gating block completes every sub-block (75% overlap)
+        - momentary is the last 4 sub-blocks, short term the last 30, both from a ring of sub-block energies
+        - integrated gates the block energies kept in a ring of LOUDNESS_HISTORY seconds: -70 LUFS absolute, then -10 LU relative
+        - true peak oversamples with a 12 tap per phase polyphase FIR, 4x below 88.2kHz, 2x below 176.4kHz
+    read() returns the levels keyed by LOUDNESS_CHANNELS, the true peak being the maximum since the last read
+    """
+    PHASE_TAPS = 12
+
+    def __init__(self, rate=RATE, channels=CHANNELS, fullscale=maxValue, history=LOUDNESS_HISTORY):
+        self.channels   = channels
+        self.fullscale  = fullscale
+        self.sos        = k_weighting(rate)
+        self.step       = int(round(rate / 10))         # samples per 100ms sub-block
+        self.subblocks  = np.zeros(30)                  # mean square of the last 3s of sub-blocks
+        self.blocks     = np.zeros(history * 10)        # mean square of each 400ms gating block
+        self.abs_gate   = 10 ** ((LOUDNESS_FLOOR + 0.691) / 10)
+
+        oversample      = 4 if rate < 88200 else 2 if rate < 176400 else 1
+        taps            = self.PHASE_TAPS * oversample
+        h               = firwin(taps, 1.0 / oversample) * oversample if oversample > 1 else np.eye(1, taps)[0]
+        # column p convolves with phase p, reversed to match the sliding windows of the input
+        self.phases     = h.reshape(self.PHASE_TAPS, oversample)[::-1]
+        self.reset()
+
+    def reset(self):
+        self.zi         = np.zeros((len(self.sos), self.channels, 2))
+        self.tail       = np.zeros((self.channels, self.PHASE_TAPS - 1))
+        self.partial    = 0.0       # energy and samples so far in the current sub-block
+        self.count      = 0
+        self.subblocks[:] = 0.0
+        self.nsub       = 0         # sub-blocks completed
+        self.nblocks    = 0         # gating blocks completed
+        self.peak       = 0.0
+        self.peak_max   = 0.0
+        self.integrated = LOUDNESS_FLOOR
+        self.integrated_at = 0
+
+    def _subblock(self, energy):
+        self.subblocks[self.nsub % len(self.subblocks)] = energy / self.step
+        self.nsub += 1
+        if self.nsub >= 4:
+            self.blocks[self.nblocks % len(self.blocks)] = self._mean(4)
+            self.nblocks += 1
+
+    def _mean(self, n):
+        """ Mean square of the last n sub-blocks, or as many as there are """
+        n = min(n, self.nsub)
+        if n == 0: return 0.0
+        i = (self.nsub - n + np.arange(n)) % len(self.subblocks)
+        return self.subblocks[i].mean()
+
+    def push(self, data):
+        """ Measure one interleaved block """
+        x = np.ascontiguousarray(data.reshape(-1, self.channels).T, dtype=np.float64) / self.fullscale      # (channels, n), float64 for the integrator
+
+        # true peak: every phase of the oversampled signal as one matrix product of the sliding windows over the
+        # block, and the tail of the previous one, with the phases of the FIR
+        x_ext     = np.concatenate((self.tail, x), axis=1)
+        self.tail = x_ext[:, -(self.PHASE_TAPS - 1):]
+        windows   = sliding_window_view(x_ext, self.PHASE_TAPS, axis=1).reshape(-1, self.PHASE_TAPS)
+        self.peak = max(self.peak, float(np.abs(windows @ self.phases).max()))
+
+        # K-weighted energy summed over the channels, split at the sub-block boundaries
+        y, self.zi = sosfilt(self.sos, x, axis=-1, zi=self.zi)
+        e          = np.einsum('ij,ij->j', y, y)
+        starts     = np.arange(self.step - self.count, len(e), self.step)
+        sums       = np.add.reduceat(e, np.concatenate(([0], starts)))
+        if len(starts):
+            self._subblock(self.partial + sums[0])
+            for energy in sums[1:-1]:
+                self._subblock(energy)
+            self.partial, self.count = sums[-1], len(e) - starts[-1]
+        else:
+            self.partial += sums[0]
+            self.count   += len(e)
+        if self.count == self.step:
+            self._subblock(self.partial)
+            self.partial, self.count = 0.0, 0
+
+    def gated(self):
+        """ Integrated loudness of the gating blocks so far, recomputed only when a block has completed """
+        if self.nblocks != self.integrated_at:
+            self.integrated_at = self.nblocks
+            z = self.blocks[:min(self.nblocks, len(self.blocks))]
+            z = z[z > self.abs_gate]
+            if len(z):
+                z = z[z > z.mean() * 0.1]
+                self.integrated = self.lufs(z.mean())
+        return self.integrated
+
+    @staticmethod
+    def lufs(ms):
+        return max(LOUDNESS_FLOOR, -0.691 + 10 * math.log10(ms)) if ms > 0 else LOUDNESS_FLOOR
+
+    @staticmethod
+    def dbtp(peak):
+        return max(LOUDNESS_FLOOR, 20 * math.log10(peak)) if peak > 0 else LOUDNESS_FLOOR
+
+    def read(self):
+        self.peak_max = max(self.peak_max, self.peak)
+        levels = (self.lufs(self._mean(4)), self.lufs(self._mean(30)), self.gated(), self.dbtp(self.peak), self.dbtp(self.peak_max))
+        self.peak = 0.0
+        return dict(zip(LOUDNESS_CHANNELS, levels))
+
+
+class FilterBank:
+    """
+    Butterworth filters run continuously on the captured audio, eg to split bass, mid and treble for a visualiser
+        - each (cutoff, order, type) is designed once as second order sections, shared by every bank at that rate
+        - each band keeps its sosfilt state for all the channels, so the output is continuous across blocks
+        - the newest frames of every band are kept in one (bands, channels, frames) array, in sample units
+    Bands are added on first use by the render thread, push() runs on the capture path
+    """
+    designs = {}    # (rate, cutoff, order, type) -> sos
+
+    def __init__(self, rate=RATE, channels=CHANNELS, frames=FRAME):
+        self.rate      = rate
+        self.channels  = channels
+        self.frames    = frames
+        self.bands     = ()                             # (key, sos) of each band, replaced whole when a band is added
+        self.zi        = []
+        self.output    = np.zeros((0, channels, frames))
+
+    @classmethod
+    def design(cls, rate, cutoff, order=5, type='lowpass'):
+        key = (rate, cutoff if np.isscalar(cutoff) else tuple(cutoff), order, type)
+        if key not in cls.designs:
+            cls.designs[key] = butter(order, cutoff, btype=type, fs=rate, output='sos')
+        return cls.designs[key]
+
+    def add(self, cutoff, order=5, type='lowpass'):
+        """ Return the index of the band, adding it if it is new.  cutoff is a (low, high) pair for a bandpass """
+        key = (cutoff if np.isscalar(cutoff) else tuple(cutoff), order, type)
+        for i, (band, _) in enumerate(self.bands):
+            if band == key: return i
+
+        sos = self.design(self.rate, cutoff, order, type)
+        self.zi.append(np.zeros((sos.shape[0], self.channels, 2)))
+        self.output = np.concatenate((self.output, np.zeros((1, self.channels, self.frames))))
+        self.bands  = self.bands + ((key, sos),)
+        return len(self.bands) - 1
+
+    def push(self, data):
+        """ Filter one interleaved block through every band """
+        bands  = self.bands     # before the output, as add() grows the output first
+        output = self.output
+        x      = data.reshape(-1, self.channels).T
+        n      = min(x.shape[1], self.frames)
+        if n < self.frames:
+            output[:, :, :-n] = output[:, :, n:]
+        for i, (_, sos) in enumerate(bands):
+            y, self.zi[i]      = sosfilt(sos, x, axis=-1, zi=self.zi[i])
+            output[i, :, -n:]  = y[:, -n:]
+
+    def get(self, band, channel):
+        """ The newest frames of a band for a channel index, or the mean of the channels for mono (None) """
+        return self.output[band].mean(axis=0) if channel is None else self.output[band, channel].copy()
+
+    def reset(self):
+        for zi in self.zi: zi[:] = 0.0
+        self.output[:] = 0.0
+
+
+class SampleEnvelope:
+    """
+    A channel of samples decimated by an integer factor into a float32 envelope, multiplied by scale
+        - minmax: (2, n) the min and max of each group, an alias free outline for oscilloscopes
+        - peak:   the max |x| of each group
+        - rms:    the RMS of each group
+        - mean:   the mean of each group, ie a box filter then decimate
+    The output and working buffers are allocated once and reused, so a caller keeping a result must copy it
+    """
+    KINDS = ('minmax', 'peak', 'rms', 'mean')
+
+    def __init__(self, length, factor, kind='minmax', scale=1.0):
+        if kind not in SampleEnvelope.KINDS:
+            raise ValueError("SampleEnvelope> unknown envelope %s, expected one of %s" % (kind, SampleEnvelope.KINDS))
+        self.length = length
+        self.factor = max(1, int(factor))
+        self.n      = length // self.factor
+        self.kind   = kind
+        self.scale  = np.float32(scale)
+        self.work   = np.zeros((self.n, self.factor), dtype=np.float32)
+        self.out    = np.zeros((2, self.n) if kind == 'minmax' else self.n, dtype=np.float32)
+        self.seq    = None      # audio frame the output was computed from
+
+    def compute(self, samples):
+        w = self.work
+        np.copyto(w, samples[:self.n * self.factor].reshape(self.n, self.factor), casting='unsafe')
+        w *= self.scale
+        if self.kind == 'minmax':
+            np.min(w, axis=1, out=self.out[0])
+            np.max(w, axis=1, out=self.out[1])
+        elif self.kind == 'peak':
+            np.abs(w, out=w)
+            np.max(w, axis=1, out=self.out)
+        elif self.kind == 'rms':
+            np.square(w, out=w)
+            np.mean(w, axis=1, out=self.out)
+            np.sqrt(self.out, out=self.out)
+        else:
+            np.mean(w, axis=1, out=self.out)
+        return self.out
+
 
 import aubio
 import threading
+import multiprocessing
+from   multiprocessing import shared_memory
 
 class AudioAnalyser:
+    threaded = True     # fed with hops of mono samples through samples_queue
+
     def __init__(self, rate=RATE, hop_s=int(FRAME/2), win_s=FRAME):
         self.rate = rate
         self.hop_s = hop_s
@@ -114,6 +881,8 @@ class AudioAnalyser:
         }
         
         self.alpha = 0.05   # Smoothing factor
+        self.tempo_enabled       = True     # beat tracking
+        self.descriptors_enabled = True     # centroid, kurtosis, flux and volume
         self._stop_event = threading.Event()
         self.samples_queue = Queue(maxsize=20)
         self.thread = threading.Thread(target=self._analysis_loop, daemon=True)
@@ -142,6 +911,15 @@ class AudioAnalyser:
         except Empty:
             pass
 
+    @property
+    def enabled(self):
+        return self.tempo_enabled or self.descriptors_enabled
+
+    def configure(self, tempo=True, descriptors=True):
+        """Select which analyses the thread runs, called when the active screen changes"""
+        self.tempo_enabled       = tempo
+        self.descriptors_enabled = descriptors
+
     def add_samples(self, samples):
         """Called by AudioProcessor.is_audio_available to feed the engine"""
         try:
@@ -168,23 +946,27 @@ class AudioAnalyser:
                 continue
 
             try:
-                # 3. Spectral Analysis
+                # 3. Beat/Tempo: CALL ONLY ONCE
+                if self.tempo_enabled:
+                    is_beat_vec = self.tempo(samples)
+                    is_beat = is_beat_vec[0] != 0
+                    
+                    if is_beat:
+                        self.audioanalysis["beat"] = True
+                        self.audioanalysis["bpm"] = self.tempo.get_bpm()
+
+                if not self.descriptors_enabled:
+                    continue
+
+                # 4. Spectral Analysis
                 fftgrain = self.pv(samples)
                 cent = self.centroid_fn(fftgrain)[0]
                 flat = self.kurtosis_fn(fftgrain)[0]
                 flux = self.flux_fn(fftgrain)[0]
 
-                # 4. Beat/Tempo: CALL ONLY ONCE
-                is_beat_vec = self.tempo(samples)
-                is_beat = is_beat_vec[0] != 0
-                
-                if is_beat:
-                    self.audioanalysis["beat"] = True
-                    self.audioanalysis["bpm"] = self.tempo.get_bpm()
-
                 # 5. Volume and Smoothing
                 vol = min(np.sqrt(np.mean(samples**2))*20, 1.0)
-                norm_cent = min(cent / (self.rate / 80.0), 1.0) 
+                norm_cent = min(cent / (self.rate / 80.0), 1.0)
                 norm_flat = min(flat / 120.0, 1.0)
                 norm_flux = min(flux / 120.0, 1.0)
 
@@ -205,6 +987,466 @@ class AudioAnalyser:
         return state
     
 
+class SpectralAnalyser:
+    """
+    Numpy alternative to the aubio AudioAnalyser that works from the complex spectrum already computed by StereoFFT,
+    so there is no second phase vocoder, no analysis thread and no queue of copied samples.
+        - centroid and kurtosis of the mono magnitude spectrum, in aubio bin units so the scaling matches
+        - complex domain flux: distance of each bin from the magnitude and phase predicted from the last two frames
+        - onset/beat: flux crossing an adaptive (median) threshold, BPM from the median inter-beat interval
+    Produces the same audioanalysis dict as AudioAnalyser
+    """
+    threaded        = False     # updated from AudioProcessor.analyse, nothing to feed
+    ONSET_HISTORY   = 16        # frames of flux used for the adaptive threshold
+    ONSET_RATIO     = 1.5       # flux must exceed the median by this ratio ...
+    ONSET_DELTA     = 0.5       # ... plus this offset to be an onset
+    MIN_BEAT_GAP    = 0.25      # seconds, ie max 240 BPM
+    BEAT_HISTORY    = 8         # beats used for the BPM estimate
+
+    def __init__(self, rate=RATE, period=SAMPLEPERIOD, nfft=FRAMESIZE//2 + NUMPADS, win_s=FRAME, hop_s=int(FRAME/2), fullscale=maxValue):
+        self.rate   = rate
+        self.fullscale = fullscale
+        self.period = period
+        self.hop_s  = hop_s
+        self.nfft   = nfft
+
+        # bin positions in aubio's bin units (win_s point FFT) and the factor to bring the flux to aubio's magnitude scale
+        self.kbins      = np.arange(nfft//2 + 1) * (win_s / nfft)
+        self.flux_scale = (win_s / 2.0) * (win_s / nfft)
+
+        # AudioAnalyser smooths once per 512 sample hop, keep the same time constant per audio frame
+        self.alpha  = 1 - (1 - 0.05) ** (period * rate / hop_s)
+
+        self.audioanalysis = {
+            "beat": False, "bpm": 0.0, "centroid": 0.0,
+            "kurtosis": 0.0, "flux": 0.0, "volume": 0.0
+        }
+        self.tempo_enabled       = True
+        self.descriptors_enabled = True
+
+        self.prev_mag    = None
+        self.prev_phase  = None
+        self.prev2_phase = None
+        self.odf         = np.zeros(self.ONSET_HISTORY)
+        self.odf_head    = 0
+        self.above       = False
+        self.time        = 0.0
+        self.beat_times  = []
+
+    @property
+    def enabled(self):
+        return self.tempo_enabled or self.descriptors_enabled
+
+    def configure(self, tempo=True, descriptors=True):
+        self.tempo_enabled       = tempo
+        self.descriptors_enabled = descriptors
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def add_samples(self, samples):
+        pass
+
+    def update(self, spectrum, scale, samples):
+        """ Analyse one audio frame: spectrum is the (2, bins) complex left/right FFT, scale normalises it to 0-1 """
+        self.time += self.period
+        mono  = (spectrum[0] + spectrum[1]) * (0.5 * scale)
+        mag   = np.abs(mono)
+        phase = np.angle(mono)
+
+        # Complex domain flux - needs two previous frames to predict the phase
+        flux = 0.0
+        if self.prev2_phase is not None:
+            predicted = self.prev_mag * np.exp(1j * (2*self.prev_phase - self.prev2_phase))
+            flux      = float(np.abs(mono - predicted).sum()) * self.flux_scale
+        self.prev2_phase, self.prev_phase, self.prev_mag = self.prev_phase, phase, mag
+
+        if self.tempo_enabled:
+            self.detect_beat(flux)
+
+        if not self.descriptors_enabled:
+            return
+
+        total = mag.sum()
+        if total > 0:
+            cent   = float((self.kbins * mag).sum() / total)
+            dev    = self.kbins - cent
+            spread = float((dev**2 * mag).sum() / total)
+            flat   = float((dev**4 * mag).sum() / (total * spread**2)) if spread > 0 else 0.0
+        else:
+            cent = flat = 0.0
+
+        vol = min(float(np.sqrt(np.mean(np.square(samples / self.fullscale))))*20, 1.0)
+        norm_cent = min(cent / (self.rate / 80.0), 1.0)
+        norm_flat = min(flat / 120.0, 1.0)
+        norm_flux = min(flux / 120.0, 1.0)
+
+        alpha = self.alpha
+        self.audioanalysis["centroid"] = (norm_cent * alpha) + (self.audioanalysis["centroid"] * (1 - alpha))
+        self.audioanalysis["kurtosis"] = (norm_flat * alpha) + (self.audioanalysis["kurtosis"] * (1 - alpha))
+        self.audioanalysis["flux"]     = (norm_flux * alpha) + (self.audioanalysis["flux"] * (1 - alpha))
+        self.audioanalysis["volume"]   = (vol * alpha) + (self.audioanalysis["volume"] * (1 - alpha))
+
+    def detect_beat(self, flux):
+        """ An onset is the flux rising through the adaptive threshold, at most one per MIN_BEAT_GAP """
+        threshold = np.median(self.odf) * self.ONSET_RATIO + self.ONSET_DELTA
+        self.odf[self.odf_head] = flux
+        self.odf_head = (self.odf_head + 1) % self.ONSET_HISTORY
+
+        above, rising = flux > threshold, not self.above
+        self.above    = above
+        if not (above and rising):
+            return
+        if self.beat_times and self.time - self.beat_times[-1] < self.MIN_BEAT_GAP:
+            return
+
+        self.beat_times.append(self.time)
+        del self.beat_times[:-self.BEAT_HISTORY]
+        self.audioanalysis["beat"] = True
+
+        if len(self.beat_times) >= 3:
+            bpm = 60.0 / float(np.median(np.diff(self.beat_times)))
+            while bpm < 60:  bpm *= 2
+            while bpm > 180: bpm /= 2
+            self.audioanalysis["bpm"] = bpm
+
+    def get_state(self):
+        """Returns the current smoothed metrics and resets the beat flag"""
+        state = self.audioanalysis.copy()
+        self.audioanalysis["beat"] = False 
+        return state
+
+
+class AudioSnapshot:
+    """
+    The results of processing one block of audio, published by the AudioWorker
+        - immutable: the attributes cannot be reassigned and the numpy arrays are made read only
+        - beats is a running count of detected beats so a reader that skips snapshots does not miss one
+    """
+    __slots__ = ('seq', 'samples', 'bins', 'vu', 'bass', 'treble', 'audioanalysis', 'signal_detected', 'beats', 'timestamp')
+
+    def __init__(self, seq, samples, bins, vu, bass, treble, audioanalysis, signal_detected, beats):
+        values = (seq, samples, bins, vu, bass, treble, audioanalysis, signal_detected, beats, time.perf_counter())
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+        for arrays in (samples, bins):
+            for a in arrays.values():
+                if isinstance(a, np.ndarray): a.flags.writeable = False
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AudioSnapshot> is immutable, cannot set %s" % name)
+
+
+class SnapshotBuffer:
+    """
+    Atomic double buffer of AudioSnapshots: a single writer fills the back slot and then flips the front index.
+    The flip is a single int store so readers always see a complete snapshot without taking a lock
+    """
+    def __init__(self):
+        self.slots = [None, None]
+        self.front = 0
+
+    def publish(self, snapshot):
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        self.front = back
+
+    def latest(self):
+        return self.slots[self.front]
+
+
+class AudioWorker:
+    """
+    Runs the DSP chain (ring buffer -> FFT -> VU -> silence detection -> bass/treble) on its own thread
+    so that none of it is charged to the render loop, which just picks up the latest AudioSnapshot
+    """
+    def __init__(self, processor):
+        self.processor   = processor
+        self.snapshots   = SnapshotBuffer()
+        self.seq         = 0
+        self.beats       = 0
+        self.process_ms  = 0.0     # smoothed DSP time per block
+        self._wake       = threading.Event()
+        self._stop_event = threading.Event()
+        self.thread      = threading.Thread(target=self._process_loop, daemon=True)
+
+    def start(self):
+        if not self.thread.is_alive():
+            self.thread.start()
+
+    def stop(self):
+        print("AudioWorker.stop> Shutting down DSP thread...")
+        self._stop_event.set()
+        self._wake.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
+    def wake(self):
+        """ Called from the capture callback when a new block is in the ring """
+        self._wake.set()
+
+    def _process_loop(self):
+        p      = self.processor
+        bass   = p.bass
+        treble = p.treble
+
+        while not self._stop_event.is_set():
+            data = p.next_block()
+            if data is None:
+                self._wake.wait(timeout=p.analysis_period)
+                self._wake.clear()
+                continue
+
+            try:
+                start = time.perf_counter()
+
+                # copy the channels out of the ring so the snapshot outlives the ring slot
+                samples = p.unpack(data, copy=True)
+                bins, vu, analysis, bass, treble = p.analyse(samples, bass, treble)
+                # and the bins out of the FFT pools, whose slots are reused while a reader may still hold the snapshot
+                bins    = {name: mags.copy() for name, mags in bins.items()}
+
+                if p.signal_detected and analysis['beat']:
+                    self.beats += 1
+
+                self.seq += 1
+                self.snapshots.publish( AudioSnapshot(self.seq, samples, bins, vu, bass, treble, analysis, p.signal_detected, self.beats) )
+                self.process_ms = 0.9*self.process_ms + 0.1*(time.perf_counter() - start)*1000
+
+            except Exception as e:
+                print(f"AudioWorker._process_loop> Error: {e}")
+
+    def __str__(self):
+        return "AudioWorker> %d blocks processed, %.2fms per block" % (self.seq, self.process_ms)
+
+
+class StreamingRecorder:
+    """
+    Records to a WAV file incrementally from a background thread, so memory use is bounded whatever the length
+        - write() copies the block into a bounded queue and never blocks the capture path: if the writer has
+          fallen behind the block is dropped and counted
+        - the writer thread appends each block to the file as it arrives, and stop() drains the queue and
+          closes the file, which finalises the WAV header
+    """
+    def __init__(self, path, rate=RATE, channels=CHANNELS, sampwidth=2, maxsize=RECORD_QUEUE_SIZE):
+        self.path     = path
+        self.queue    = Queue(maxsize=maxsize)
+        self.frames   = 0       # frames queued to be written
+        self.dropped  = 0       # blocks lost because the queue was full
+        self.channels = channels
+        self.rate     = rate
+
+        self.file     = wave.open(path, 'wb')
+        self.file.setnchannels(channels)
+        self.file.setsampwidth(sampwidth)
+        self.file.setframerate(rate)
+        self.thread   = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    @property
+    def seconds(self):
+        return self.frames / self.rate
+
+    def write(self, data):
+        """ Queue a copy of one interleaved block, returns False if it had to be dropped """
+        if data.dtype.kind == 'f':
+            # WAV PCM has no float format here, write float samples as 32 bit
+            data = (np.clip(data, -1.0, 1.0) * (2**31 - 1)).astype(np.int32)
+        try:
+            self.queue.put_nowait(data.tobytes())   # copy out, as the ring slot will be reused
+        except Full:
+            self.dropped += 1
+            return False
+        self.frames += len(data) // self.channels
+        return True
+
+    def _write_loop(self):
+        while True:
+            block = self.queue.get()
+            if block is None:
+                break
+            try:
+                # the header is only patched when the file is closed
+                self.file.writeframesraw(block)
+            except Exception as e:
+                print("StreamingRecorder._write_loop> ", e)
+
+    def stop(self):
+        """ Write out what is queued and finalise the file """
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+        return self.path
+
+    def __str__(self):
+        return "StreamingRecorder> %s, %.1fs recorded, %d blocks dropped" % (self.path, self.seconds, self.dropped)
+
+
+SHARED_CHANNELS = ('left', 'right', 'mono')
+SHARED_SCALARS  = ('bass', 'treble', 'beats', 'signal_detected', 'bpm', 'centroid', 'kurtosis', 'flux', 'volume')
+SHARED_BINS     = DEFAULT_CONFIG.bins                 # length of the rfft magnitude output of the default config
+SHARED_LOWBINS  = LOWBAND_FFT//2 + 1                  # length of the LowBandFFT magnitudes
+
+class SharedAudioState:
+    """
+    Analysis results published by the audio engine process into a multiprocessing.shared_memory block
+        - the block holds a sequence lock header followed by the bins, vu, samples and scalar arrays
+        - the writer makes the sequence odd while it updates, then even again once the results are complete
+        - the reader maps the block zero-copy, and copies into its own preallocated arrays only when the
+          sequence is even and unchanged across the copy, so it never sees a torn frame
+    """
+    def __init__(self, name=None, config=None):
+        # the writer and reader must be created with the same AudioConfig, as it sizes the arrays
+        config  = config or DEFAULT_CONFIG
+        bins    = config.bins
+        frames  = config.framesize
+        samples = config.dtype
+        layout = (('seq',     np.uint64, (1,)),
+                  ('features', np.uint64, (1,)),      # bit mask of AUDIO_FEATURES requested by the render process
+                  ('bins',    np.float64, (len(SHARED_CHANNELS), bins)),
+                  ('lowbins', np.float64, (len(LOWBAND_CHANNELS), SHARED_LOWBINS)),
+                  ('vu',      np.float64, (len(LEVEL_CHANNELS),)),
+                  ('scalars', np.float64, (len(SHARED_SCALARS),)),
+                  ('samples', samples,    (len(SHARED_CHANNELS), frames)))
+
+        size = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in layout)
+        self.owner  = name is None
+        self.shm    = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.name   = self.shm.name
+
+        offset = 0
+        for field, dtype, shape in layout:
+            array   = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            offset += array.nbytes
+            setattr(self, field, array)
+        if self.owner:
+            self.seq[0] = 0
+            self.set_features(AUDIO_FEATURES)
+
+        # reader side copies, preallocated so a read never allocates
+        self.last_seq    = 0
+        self.bins_out    = np.zeros_like(self.bins)
+        self.lowbins_out = np.zeros_like(self.lowbins)
+        self.vu_out      = np.zeros_like(self.vu)
+        self.scalars_out = np.zeros_like(self.scalars)
+        self.samples_out = np.zeros_like(self.samples)
+
+    def publish(self, processor, beats):
+        """ Writer side: copy the results of the last process() into the block under the sequence lock """
+        self.seq[0] += 1        # odd: update in progress
+        for i, channel in enumerate(SHARED_CHANNELS):
+            self.bins[i, :len(processor.bins[channel])]       = processor.bins[channel]
+            self.samples[i, :len(processor.samples[channel])] = processor.samples[channel]
+        for i, level in enumerate(LEVEL_CHANNELS):
+            self.vu[i] = processor.vu.get(level, 0.0)
+        for i, channel in enumerate(LOWBAND_CHANNELS):
+            if channel in processor.bins:
+                self.lowbins[i, :len(processor.bins[channel])] = processor.bins[channel]
+
+        analysis = processor.audioanalysis
+        self.scalars[:] = (processor.bass, processor.treble, beats, processor.signal_detected,
+                           analysis['bpm'], analysis['centroid'], analysis['kurtosis'], analysis['flux'], analysis['volume'])
+        self.seq[0] += 1        # even: complete
+
+    def read(self, retries=3):
+        """ Reader side: copy a consistent frame into the *_out arrays, True if there is a new one """
+        for _ in range(retries):
+            seq = int(self.seq[0])
+            if seq == self.last_seq:
+                return False
+            if seq & 1:
+                continue
+
+            np.copyto(self.bins_out,    self.bins)
+            np.copyto(self.lowbins_out, self.lowbins)
+            np.copyto(self.vu_out,      self.vu)
+            np.copyto(self.scalars_out, self.scalars)
+            np.copyto(self.samples_out, self.samples)
+
+            if int(self.seq[0]) == seq:
+                self.last_seq = seq
+                return True
+        return False
+
+    def set_features(self, features):
+        self.features[0] = sum(1 << i for i, f in enumerate(sorted(AUDIO_FEATURES)) if f in features)
+
+    def get_features(self):
+        mask = int(self.features[0])
+        return frozenset(f for i, f in enumerate(sorted(AUDIO_FEATURES)) if mask & (1 << i))
+
+    def scalar(self, name):
+        return self.scalars_out[SHARED_SCALARS.index(name)]
+
+    def close(self):
+        self.shm.close()
+        if self.owner: self.shm.unlink()
+
+
+def _audio_engine_main(name, device, options, stop_event):
+    """ Entry point of the audio engine process: capture, process() and AudioAnalyser, published to shared memory """
+    shared = SharedAudioState(name=name, config=options.get('config'))
+    if multiprocessing.get_start_method() != 'fork':
+        # a spawned process has its own tracker, which would unlink the parent's block on exit.
+        # Forked processes share the parent's tracker, so its registration must be left alone
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shared.shm._name, 'shared_memory')
+
+    processor = AudioProcessor(Events(('Audio',)), device=device, **options)
+    processor.start_capture()
+    beats = 0
+
+    while not stop_event.is_set():
+        features = shared.get_features()
+        if features != processor.features:
+            processor.set_features(features)
+
+        if not processor.is_audio_available():
+            stop_event.wait(processor.analysis_period/4)
+            continue
+
+        processor.process()
+        if processor.trigger_detected:
+            beats += 1
+        shared.publish(processor, beats)
+
+    processor.stop_capture()
+    shared.close()
+
+
+class AudioEngineProcess:
+    """
+    Runs capture and the DSP in a separate process so the audio analysis uses another core rather than
+    competing with the render loop for the GIL.  The results are read back through a SharedAudioState
+    """
+    def __init__(self, device, **options):
+        # options are the AudioProcessor keyword arguments the engine's processor is created with
+        self.shared      = SharedAudioState(config=options.get('config'))
+        self._stop_event = multiprocessing.Event()
+        self.process     = multiprocessing.Process(target=_audio_engine_main, daemon=True, \
+                                                   args=(self.shared.name, device, options, self._stop_event))
+
+    def start(self):
+        if not self.process.is_alive():
+            self.process.start()
+            print("AudioEngineProcess.start> audio engine running in process", self.process.pid)
+
+    def stop(self):
+        print("AudioEngineProcess.stop> Shutting down audio engine process...")
+        self._stop_event.set()
+        if self.process.is_alive():
+            self.process.join(timeout=2.0)
+            if self.process.is_alive(): self.process.terminate()
+        self.shared.close()
+
+    def __str__(self):
+        return "AudioEngineProcess> pid %s, frame sequence %d" % (self.process.pid, self.shared.last_seq//2)
+
+
 class AudioData():
     def __init__(self):
         data          = [0.5]*50
@@ -249,81 +1491,127 @@ class AudioData():
 
 
 class AudioProcessor(AudioData):
-    def __init__(self, events, device='BlackHole 2ch'):
+    band_tables = {}    # createBands results by (spacing, fcentre, flast, rate, FFT size, low band, engine)
+
+    def __init__(self, events, device='BlackHole 2ch', dsp_thread=False, dsp_process=False, analyser='aubio', \
+                 capture_frames=None, hop=STFT_HOP, lowband=False, band_engine='fft', source=None, config=None, ballistics=True, \
+                 fft_workers=FFT_WORKERS):
         self.events   = events
-        self.recorder = pyaudio.PyAudio()
         self.audio_available = False
 
-        # set up audio input
-        self.find_device_index(device)
+        # rate, frame size and sample format, every DSP constant is derived from this
+        self.config   = config = config or AudioConfig()
 
-        self.recordingState = RECORDSTATE
-        self.recording      = []
+        self.recordingState = False
+        self.recording      = None      # the StreamingRecorder while recording
+        self.record_limit   = False     # set on the capture path at RECORDTIME, the owner stops the recording
         #self.device = 1
-        self.analysis = AudioAnalyser(rate=RATE)
+
+        # Capture in blocks of capture_frames.  With a hop the blocks feed a sliding window analysed every hop frames,
+        # otherwise each block is analysed as it arrives
+        self.capture_frames  = int(capture_frames or config.framesize)
+        self.stft            = SlidingWindow(config.framesize, hop, config.channels, config.dtype) if hop else None
+        self.analysis_period = max(self.capture_frames, hop or 0) / config.rate   # seconds between analysis frames
+
+        # set up audio input: the sound card device, or a file, pipe or synthetic source (see make_source)
+        # the audio engine process opens its own, so none is needed here
+        self.source = None if dsp_process else make_source(source, device, config.rate, config.channels, self.capture_frames, config.format)
+
+        # 'aubio' runs its own phase vocoder on a thread, 'numpy' reuses the main FFT
+        if analyser == 'numpy':
+            self.analysis = SpectralAnalyser(config.rate, self.analysis_period, config.nfft, config.frame, config.frame//2, config.fullscale)
+        else:
+            self.analysis = AudioAnalyser(rate=config.rate, hop_s=config.frame//2, win_s=config.frame)
         AudioData.__init__(self)
 
         self.peakC      = RMSNOISEFLOOR
         self.minC       = maxValue
         self.dc         = []
         self.readtime   = []
-        self.silence    = WindowAve(SILENCESAMPLES)
-        self.window     = np.kaiser(FRAME + 0, WINDOW)  #Hanning window
-        print("AudioProcessor.__init__> ready and reading from soundcard %s, Recording is %s " % (self.recorder.get_device_info_by_index(self.device)['name'], RECORDSTATE))
+        self.silence    = WindowAve(7 / self.analysis_period)      # 7 seconds worth of analysis frames
+        self.window     = np.kaiser(config.frame, WINDOW)  #Hanning window
+        self.fft        = StereoFFT(config.frame, config.nfft, fft_workers, fullscale=config.fullscale, dtype=config.float_dtype)
+        # multi-resolution bass, see bandPlan().  The decimation scales with the rate to keep the same low band
+        self.lowband    = LowBandFFT(decimate=max(1, round(LOWBAND_DECIMATE * config.rate / RATE)), rate=config.rate, workers=fft_workers, \
+                                     fullscale=config.fullscale, channels=config.channels) if lowband else None
+        print("AudioProcessor.__init__> ready and reading from %s, Recording is %s " % (self.source or 'the audio engine', RECORDSTATE))
+        print("AudioProcessor.__init__>", config)
+
+        # audio rate VU, PPM and sample peak meters, otherwise the VU is the RMS of each analysis frame
+        self.meters     = MeterBallistics(config.rate, config.channels, config.fullscale) if ballistics else None
+        self.loudness   = LoudnessMeter(config.rate, config.channels, config.fullscale)
+        self.filters    = FilterBank(config.rate, config.channels, config.framesize)   # the frames of each channel
+
+        # the ring holds at least as much audio as AUDIO_QUEUE_MAXSIZE full size blocks
+        self.audio_ring = AudioRingBuffer(max(AUDIO_QUEUE_MAXSIZE, AUDIO_QUEUE_MAXSIZE*config.framesize//self.capture_frames), \
+                                          self.capture_frames*config.channels, config.dtype)
+
+        # Optionally run the DSP on its own thread, the render loop then calls read_snapshot() rather than process()
+        self.trigger_detected = []
+        self.audioanalysis    = self.analysis.get_state()
+        self.dsp_worker       = AudioWorker(self) if dsp_thread and not dsp_process else None
+        self.dsp_engine       = AudioEngineProcess(device, analyser=analyser, capture_frames=self.capture_frames, hop=hop, lowband=lowband, source=source, config=config, ballistics=ballistics, fft_workers=fft_workers) if dsp_process else None
+        self.snapshot_seq     = 0
+        self.beats_seen       = 0
+
+        # Only the features used by the active screen are computed, see set_features()
+        self.features         = AUDIO_FEATURES
+        self.no_bins          = {ch: np.zeros(self.fft.bins) for ch in ('left', 'right', 'mono')}
+        if self.lowband:
+            self.no_bins.update({ch: np.zeros(self.lowband.bins) for ch in LOWBAND_CHANNELS})
+
+        # packFFT results are memoised per (band plan, channel) for the current audio frame
+        self.audio_seq        = 0       # advanced every time new bins are available
+        self.band_plans       = {}
+        self.band_cache       = {}
+        self.band_hits        = 0
+        self.band_misses      = 0
+
+        # 'fft' averages the linear bins in each band (BandPlan), 'cqt' applies a constant Q kernel (ConstantQPlan)
+        self.band_engine      = band_engine
+        self.cq_cache         = {}
 
-        self.audio_queue = Queue(maxsize=AUDIO_QUEUE_MAXSIZE)
+        # decimated sample envelopes, memoised per (channel, factor, ...) for the current audio frame
+        self.envelopes        = {}
+
+        if RECORDSTATE: self.start_recording()
 
 
     @property
     def framesize(self):
-        return FRAME    
-
-    def find_device_index(self, device):
-        # print("\nTarget audio device:", device)
-        # print("Available audio devices:")
-        # for i in range(p.get_device_count()):
-        #     info = p.get_device_info_by_index(i)
-        #     if info['maxInputChannels'] > 0:
-        #         print(f"  Device {i}: {info['name']} (inputs: {info['maxInputChannels']})")
-  
-        p = self.recorder
-        try:
-            # Try to find the loopback device
-            loopback_device = None
-            for i in range(p.get_device_count()):
-                info = p.get_device_info_by_index(i)
-                if device.lower() in info['name'].lower():
-                    self.device = i
-                    # print(f"Found loop back device {info['name']}  at index {info['index']} ")
-                    break
-
-        except Exception as e:
-            print(f"\nAudioProcessor.find_device_index> ❌ ERROR: {e}")
-            print("AudioProcessor.find_device_index> Check your ALSA configuration and device permissions")
-            self.device = 4
-        
+        return self.config.frame
 
     def start_capture(self):
+        if self.dsp_engine:
+            # capture is done by the audio engine process
+            self.dsp_engine.start()
+            return
+
         try:
-            self.stream   = self.recorder.open(format = INFORMAT,rate = RATE,channels = CHANNELS,input = True, \
-                                               input_device_index=self.device, frames_per_buffer=FRAMESIZE, stream_callback=self.callback)
-            self.stream.start_stream()
+            # sources that can outrun the pipeline (eg a file played as fast as possible) wait while the ring is nearly full
+            self.source.start(self.callback, backpressure=lambda: self.audio_ring.available >= self.audio_ring.blocks - 2)
             self.analysis.start()
-            print("AudioProcessor.start_capture> ADC/DAC ready ", self.recorder.get_device_info_by_index(self.device)['name'], " index>", self.device)
+            if self.dsp_worker: self.dsp_worker.start()
+            print("AudioProcessor.start_capture> ADC/DAC ready ", self.source)
+            print("AudioProcessor.start_capture>", self.latency_report())
         except Exception as e:
             print("AudioProcessor.start_capture> ADC/DAC not available", e)
 
     def stop_capture(self):
         try:
+            if self.dsp_engine:
+                self.dsp_engine.stop()
+                return
+
+            if self.dsp_worker: self.dsp_worker.stop()
             self.analysis.stop()
-            self.stream.stop_stream()
-            self.stream.close()
-            self.recorder.terminate()
+            self.source.stop()
         except Exception as e:
             print("AudioProcessor.Stop_capture> error", e)
 
-    # ------------switch to running the callback in a queue to prevent blocking --------------
-    def callback(self, in_data, frame_count, time_info, status):
+    # ------------switch to running the callback into a ring buffer to prevent blocking --------------
+    def callback(self, in_data, frame_count=None, time_info=None, status=0):
+        """ The sink of every AudioSource, with the PyAudio stream callback signature """
 
         # 1. START HIGH-RESOLUTION TIMER
         start_time = time.perf_counter()
@@ -331,14 +1619,12 @@ class AudioProcessor(AudioData):
         # 2. CHECK FOR AUDIO BUFFER OVERFLOW
         # The 'status' flag tells us if the buffer overflowed BEFORE we even started processing.
         if status & pyaudio.paInputOverflow:
-            print(f"AudioProcessor.callback> *** [FRAME DROPPED] *** queue size ", self.audio_queue.qsize())
+            print(f"AudioProcessor.callback> *** [FRAME DROPPED] *** ", self.audio_ring)
             
-        # --- Existing Audio Capture and Processing ---
+        # --- Copy the raw bytes into the preallocated ring, oldest blocks are dropped if the reader is behind ---
         try:
-            in_data = np.frombuffer(in_data, dtype=np.int16)
-            if not self.audio_queue.full():
-                self.audio_queue.put_nowait(in_data)
-                # print("AudioProcessor.callback> audio frame queued, queue size:", self.audio_queue.qsize())
+            self.audio_ring.write(in_data)
+            if self.dsp_worker: self.dsp_worker.wake()
         except Exception as e:
             print("AudioProcessor.callback> exception ", e)
             pass
@@ -364,89 +1650,182 @@ class AudioProcessor(AudioData):
 
     def is_audio_available(self):
         """
-        Polls the audio queue, processes stereo samples for legacy VU meters,
+        Polls the audio ring buffer, processes stereo samples for legacy VU meters,
         and feeds normalized mono chunks to the Aubio background thread.
         """
         # Reset the flag for this check
         self.audio_available = False
 
-        if not self.audio_queue.empty():
-            try:
-                # 1. Get raw int16 data from the capture thread
-                data = self.audio_queue.get_nowait()
-                
-                # 2. Split for Legacy Stereo components (VU meters, etc.)
-                # data is interleaved [L, R, L, R...]
-                self.samples['left']  = data[0::2]
-                self.samples['right'] = data[1::2]
-                
-                # 3. Create Mono Int16 for existing logic
-                # Reshape to (1024, 2) and average across axis 1
-                mono_int16 = np.mean(data.reshape(-1, CHANNELS), axis=1).astype(np.int16)
-                self.samples['mono']  = mono_int16
-                
-                # 4. Normalize to Float32 (-1.0 to 1.0) for Aubio
-                # Aubio crashes or produces noise if not float32 or if range is wrong
-                mono_float32 = mono_int16.astype(np.float32) / 32768.0
-
-                # 5. Feed the Analyser in "Hops"
-                # If FRAME is 1024 and hop_s is 512, this loop runs twice.
-                # This ensures the Analyser thread gets exactly what it expects.
-                hop_s = self.analysis.hop_s
-                for i in range(0, len(mono_float32), hop_s):
-                    chunk = mono_float32[i : i + hop_s]
-                    if len(chunk) == hop_s:
-                        # print("DEBUG: Feeding chunk to Analyser")
-                        self.analysis.add_samples(chunk)
-
-                # 6. Housekeeping
-                if self.recording:
-                    self.record(data)
-                
+        try:
+            # 1. Get a zero-copy view of the next raw int16 block (or sliding window) to analyse
+            data = self.next_block()
+
+            if data is not None:
+                # 2. Split for the stereo/mono components
+                self.samples = self.unpack(data)
                 self.audio_available = True
 
-            except Empty:
-                self.audio_available = False
-            except Exception as e:
-                print(f"AudioProcessor.is_audio_available> Error: {e}")
-                self.audio_available = False
+        except Exception as e:
+            print(f"AudioProcessor.is_audio_available> Error: {e}")
+            self.audio_available = False
 
         return self.audio_available
+
+    def next_block(self):
+        """
+        Take the captured blocks from the ring, feed them to the Aubio analyser and the recorder,
+        and return the next interleaved int16 block to analyse, or None if there is nothing new.
+        In the sliding window mode every block queued is taken, and the window is returned once a hop is due
+        """
+        if self.stft is None:
+            data = self.audio_ring.read()
+            if data is not None:
+                self.capture(data)
+            return data
+
+        while self.audio_ring.available:
+            data = self.audio_ring.read()
+            self.capture(data)
+            self.stft.push(data)
+
+        return self.stft.frame() if self.stft.ready else None
+
+    def capture(self, data):
+        """ Each captured block goes to the threaded analyser and the recording exactly once """
+        if self.analysis.threaded and self.analysis.enabled:
+            # Normalize to Float32 (-1.0 to 1.0) for Aubio
+            # Aubio crashes or produces noise if not float32 or if range is wrong
+            mono_float32 = np.mean(data.reshape(-1, self.config.channels), axis=1, dtype=np.float32) / np.float32(self.config.fullscale)
+
+            # Feed the Analyser in "Hops"
+            # If FRAME is 1024 and hop_s is 512, this loop runs twice.
+            # This ensures the Analyser thread gets exactly what it expects.
+            hop_s = self.analysis.hop_s
+            for i in range(0, len(mono_float32), hop_s):
+                chunk = mono_float32[i : i + hop_s]
+                if len(chunk) == hop_s:
+                    self.analysis.add_samples(chunk)
+
+        if self.lowband is not None and 'bins' in self.features:
+            self.lowband.push(data)
+
+        if self.meters is not None and 'vu' in self.features:
+            self.meters.push(data)
+
+        if 'loudness' in self.features:
+            self.loudness.push(data)
+
+        if self.filters.bands:
+            self.filters.push(data)
+
+        if self.recordingState:
+            self.record(data)
+
+    def unpack(self, data, copy=False):
+        """
+        Split an interleaved int16 block into left, right and mono sample arrays.
+        The left/right arrays are views into the ring (or sliding window) unless copy is set
+        """
+        # data is interleaved [L, R, L, R...]
+        left, right = data[0::2], data[1::2]
+        if copy:
+            left, right = left.copy(), right.copy()
+
+        # Create Mono in the sample format for existing logic - reshape to (1024, 2) and average across axis 1
+        mono = np.mean(data.reshape(-1, self.config.channels), axis=1, dtype=self.config.float_dtype).astype(self.config.dtype)
+
+        return {'left': left, 'right': right, 'mono': mono}
+
+    def read_snapshot(self):
+        """
+        Render thread side of the DSP worker: install the latest published AudioSnapshot as the
+        platform audio fields (samples, bins, vu, bass, treble, audioanalysis).  Returns True if it is new
+        """
+        if self.dsp_engine:
+            return self.read_shared()
+
+        snapshot = self.dsp_worker.snapshots.latest()
+        if snapshot is None or snapshot.seq == self.snapshot_seq:
+            return False
+
+        beat = snapshot.beats != self.beats_seen
+        self.snapshot_seq     = snapshot.seq
+        self.audio_seq       += 1
+        self.beats_seen       = snapshot.beats
+        self.samples          = snapshot.samples
+        self.bins             = snapshot.bins
+        self.vu               = snapshot.vu
+        self.bass             = snapshot.bass
+        self.treble           = snapshot.treble
+        self.audioanalysis    = dict(snapshot.audioanalysis, beat=beat)
+        self.trigger_detected = ['beat'] if beat else []
+        return True
+
+    def read_shared(self):
+        """ As read_snapshot, but from the shared memory published by the audio engine process """
+        shared = self.dsp_engine.shared
+        if not shared.read():
+            return False
+
+        beats = int(shared.scalar('beats'))
+        beat  = beats != self.beats_seen
+        self.beats_seen       = beats
+        self.snapshot_seq     = shared.last_seq
+        self.audio_seq       += 1
+        self.samples          = dict(zip(SHARED_CHANNELS, shared.samples_out))
+        self.bins             = dict(zip(SHARED_CHANNELS, shared.bins_out))
+        if self.lowband: self.bins.update(zip(LOWBAND_CHANNELS, shared.lowbins_out))
+        self.vu               = dict(zip(LEVEL_CHANNELS, shared.vu_out.tolist()))
+        self.bass             = shared.scalar('bass')
+        self.treble           = shared.scalar('treble')
+        self.signal_detected  = bool(shared.scalar('signal_detected'))
+        self.audioanalysis    = {name: shared.scalar(name) for name in ('bpm', 'centroid', 'kurtosis', 'flux', 'volume')}
+        self.audioanalysis['beat'] = beat
+        self.trigger_detected = ['beat'] if beat else []
+        return True
     #----------------------------------------
 
     def start_recording(self):
-        self.recordingState = True
+        if self.recording: return
+        self.recordfile = self.find_next_file( RECORDINGS_PATTERN )
+        try:
+            self.recording      = StreamingRecorder(self.recordfile, self.config.rate, self.config.channels, self.config.record_sampwidth)
+            self.recordingState = True
+            print("AudioProcessor.start_recording> recording to", self.recordfile)
+        except Exception as e:
+            print("AudioProcessor.start_recording> ", e)
 
     def stop_recording(self):
+        """ Joins the writer thread, so call from the owner (eg the render loop) never the capture path """
+        recording, self.recording = self.recording, None
         self.recordingState = False
-        self.saveRecording()
-        self.recording = []
+        self.record_limit   = False
+        self.saveRecording(recording)
         self.events.Audio('recording_stopped')
 
-    def record(self, data):
-        if self.recordingState:
-            self.recording.append(data)
-
-            if len(self.recording) >  RECORDTIME:
-                self.stop_recording()
-
-            elif len(self.recording) % SAMPLEPERIOD == 1:
-                print("AudioProcessor.record> recorded %fs audio " % len(self.recording)/SAMPLEPERIOD )
+    def poll_recording(self):
+        """ Called by the owner each loop, stops the recording once the capture path has flagged RECORDTIME """
+        if self.record_limit:
+            print("AudioProcessor.poll_recording> %ds limit reached" % RECORDTIME)
+            self.stop_recording()
 
-    def saveRecording(self):
-        # Save the recorded data as a WAV file
-        self.recordfile = self.find_next_file( RECORDINGS_PATTERN )
-        print('Finished recording to ', self.recordfile)
+    def record(self, data):
+        # a local reference as stop_recording may clear self.recording from another thread
+        recording = self.recording
+        if self.recordingState and recording is not None:
+            recording.write(data)
+
+            if recording.seconds > RECORDTIME:
+                self.recordingState = False     # stop queueing, poll_recording finalises the file
+                self.record_limit   = True
+
+    def saveRecording(self, recording=None):
+        # Finalise the WAV file, the blocks have already been streamed to it
+        recording = recording or self.recording
+        if recording is None: return
         try:
-            # bits = self.recorder.get_sample_size(INFORMAT)
-            # wf = PyWave.open(recordfile, mode='w', channels = CHANNELS, frequency = RATE, bits_per_sample = bits, format = INFORMAT)
-            wf = wave.open(self.recordfile, 'wb')
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(self.recorder.get_sample_size(INFORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(self.recording))
-
-            wf.close()
+            recording.stop()
+            print('Finished recording to ', recording)
         except Exception as e:
             print("AudioProcessor.save_recording> ", e)
 
@@ -480,59 +1859,88 @@ class AudioProcessor(AudioData):
 
 
     def process(self, bass=500, treble=5000):
-        # self.smoothed_samples['left']  = np.add(SMOOTHFACTOR * self.oldsamples['left'], (1-SMOOTHFACTOR)*self.samples['left'])
-        # self.smoothed_samples['right'] = np.add(SMOOTHFACTOR * self.oldsamples['right'], (1-SMOOTHFACTOR)*self.samples['right'])
-        # left  = self.samples['left']
-        # right = self.samples['right']
-
-        self.bins['left']   = self.calcFFT(self.samples['left'])
-        self.bins['right']  = self.calcFFT(self.samples['right'])
-        # The fastest way using already computed magnitude bins
-        self.bins['mono'] = (self.bins['left'] + self.bins['right']) / 2.0
-        # self.bins['mono']   = self.calcFFT(self.samples['mono'])
-        # self.bins['left']     = self.spectral_average(left, 'left')
-        # self.bins['right']    = self.spectral_average(right, 'right')
-
-
-        self.vu['left']     = self.VU('left')
-        self.vu['right']    = self.VU('right')
-        self.vu['mono']     = self.VU('mono')
-        
-        self.audioanalysis  = self.analysis.get_state()
-        # print(self.audioanalysis)
+        """ Process the latest samples inline, on the calling thread """
+        self.bins, self.vu, self.audioanalysis, self.bass, self.treble = self.analyse(self.samples, self.bass, self.treble)
+        self.audio_seq += 1
 
-        self.detectSilence()
+        # Only trigger on a beat when there is a signal
+        self.trigger_detected = ['beat'] if self.signal_detected and self.audioanalysis['beat'] else []
+
+    def analyse(self, samples, bass, treble):
+        """
+        Run the FFT, VU, silence detection and bass/treble smoothing on one set of samples.
+        Returns new (bins, vu, audioanalysis, bass, treble) objects rather than updating them in place,
+        so that it can run on the DSP worker while the render thread reads the previous results
+        """
+        features = self.features
+
+        # Both channels in one FFT, mono is the average of the already computed magnitude bins
+        bins = self.fft.transform(samples['left'], samples['right']) if 'bins' in features else self.no_bins
+        if self.lowband is not None and 'bins' in features:
+            bins.update(self.lowband.transform())
+
+        if self.meters is not None and 'vu' in features:
+            vu = self.meters.read()
+        else:
+            vu = {}
+            vu['left']     = self.rmsVU(samples['left'])
+            vu['right']    = self.rmsVU(samples['right'])
+            vu['mono']     = self.rmsVU(samples['mono'])
+
+        if 'loudness' in features:
+            vu.update(self.loudness.read())
+
+        if not self.analysis.threaded and self.analysis.enabled:
+            self.analysis.update(self.fft.spectrum, self.fft.scale, samples['mono'])
+        audioanalysis  = self.analysis.get_state()
+
+        self.detectSilence(vu)
 
-        if self.signal_detected:
-            # Only update BPM when there is a signal
-            if self.audioanalysis['beat']:
-                self.trigger_detected.append('beat')
-            
         # Bass and Treble calculation from FFT bins
-        bins = self.bins['mono']
-        if len(bins) > 1:
-            # Bass: energy below 300 Hz. Bin width is ~21.5 Hz. 300/21.5 = ~13.9
-            bass_cutoff_bin = 14
+        mono = bins['mono']
+        if len(mono) > 1 and not features.isdisjoint(('bass', 'treble')):
+            # Bass: energy below 300 Hz. Bin width is ~21.5 Hz at 44.1kHz. 300/21.5 = ~13.9
+            bass_cutoff_bin = self.config.bass_bin
             # Use mean instead of sum for more stable energy reading
-            bass_energy = np.mean(bins[1:bass_cutoff_bin])
+            bass_energy = np.mean(mono[1:bass_cutoff_bin])
             # Multiply to scale up the average energy to a 0-1 range. The divisor was for the incorrect sum.
             target_bass = np.clip(bass_energy * 4.0, 0.0, 1.0)
-            self.bass = (self.bass * 0.8) + (target_bass * 0.2)
+            bass = (bass * 0.8) + (target_bass * 0.2)
 
             # Treble: energy above 3 kHz. 3000/21.5 = ~139.5
-            treble_cutoff_bin = 140
+            treble_cutoff_bin = self.config.treble_bin
             # Use mean for treble as well
-            treble_energy = np.mean(bins[treble_cutoff_bin:])
+            treble_energy = np.mean(mono[treble_cutoff_bin:])
             # Treble energy is typically lower, so it needs a higher multiplier
             target_treble = np.clip(treble_energy * 8.0, 0.0, 1.0)
-            self.treble = (self.treble * 0.8) + (target_treble * 0.2)
+            treble = (treble * 0.8) + (target_treble * 0.2)
 
-        self.trigger_detected = []
+        return bins, vu, audioanalysis, bass, treble
  
 
-    def detectSilence(self):
+    def set_features(self, features):
+        """
+        Set the audio features computed each frame, eg the union of the requires sets of the active screen's frames.
+        Stages nobody uses are skipped: the FFT, bass/treble and the aubio tempo and spectral descriptors
+        """
+        features = set(features) & AUDIO_FEATURES
+        if not features.isdisjoint(('bass', 'treble')):
+            features.add('bins')
+        if not self.analysis.threaded and not features.isdisjoint(('beat', 'analysis')):
+            features.add('bins')    # the numpy analyser works from the main FFT
+
+        if 'loudness' in features and 'loudness' not in self.features:
+            self.loudness.reset()   # a new measurement, the integrated loudness starts again
+
+        self.features = frozenset(features)
+        self.analysis.configure(tempo='beat' in features, descriptors='analysis' in features)
+        if self.dsp_engine: self.dsp_engine.shared.set_features(self.features)
+        print("AudioProcessor.set_features> computing", sorted(self.features))
+
+    def detectSilence(self, vu=None):
         # Corrected hysteresis logic for silence detection
-        signal_level = (self.vu['left'] + self.vu['right']) / 2.0
+        vu = self.vu if vu is None else vu
+        signal_level = (vu['left'] + vu['right']) / 2.0
         # A long-term average to determine if we are in a state of silence
         ave_level = self.silence.average(signal_level)
 
@@ -548,13 +1956,27 @@ class AudioProcessor(AudioData):
             self.events.Audio('signal_detected')
 
 
-    def createBands(self, spacing, fcentre=FIRSTCENTREFREQ, flast=LASTCENTREFREQ):
+    @property
+    def band_key(self):
+        """ What the band tables depend on: the rate, FFT size, low band and band engine """
+        return (self.config.rate, self.fft.nfft, self.lowband.key if self.lowband else None, self.band_engine)
+
+    def createBands(self, spacing, fcentre=FIRSTCENTREFREQ, flast=None):
         '''
         Create the upper bounds of each interval as an array that can be used to fill the fft data
         - spacing is the octave spacing eg 3.0, 6.0
         - fcentre is the lowest start frequency eg 31.25
+        - flast is the highest, by default a third of the rate
         '''
-        flast = LASTCENTREFREQ if flast is None else flast
+        flast = self.config.lastcentrefreq if flast is None else flast
+
+        # The band table only depends on these, so work it out once and share it (copied as callers may keep it)
+        key = (spacing, fcentre, flast) + self.band_key
+        if key not in AudioProcessor.band_tables:
+            AudioProcessor.band_tables[key] = tuple(self._createBands(spacing, fcentre, flast))
+        return list(AudioProcessor.band_tables[key])
+
+    def _createBands(self, spacing, fcentre, flast):
         intervalUpperF      = []
         centres             = []
         # print("AudioProcessor.createBands >Calculate Octave band frequencies: 1/%2d octave, starting at %2f Hz" % (spacing, fcentre))
@@ -565,18 +1987,27 @@ class AudioProcessor(AudioData):
         FFACTOR       = math.pow(2, 1.0/float(2*spacing) )
         intervalUpper = fcentre * FFACTOR
 
+        # with the multi-resolution low band the bands up to the crossover are fitted to its finer bins
+        binbandwidth  = self.config.binbandwidth
+        bandwidth     = self.lowband.bandwidth if self.lowband else binbandwidth
+
         while intervalUpper < flast:
-            bincount        = startbin
             fcentre         = fcentre * math.pow(2, float(1.0/spacing))
             intervalUpper   = fcentre * FFACTOR
 
-            if bincount*BINBANDWIDTH > intervalUpper:
+            if bandwidth != binbandwidth and intervalUpper > self.lowband.crossover:
+                # above the crossover carry on with the main FFT bins, from just above the last low band
+                bandwidth   = binbandwidth
+                startbin    = int(intervalUpperF[-1]/binbandwidth) + 1 if intervalUpperF else 1
+            bincount        = startbin
+
+            if bincount*bandwidth > intervalUpper and self.band_engine != 'cqt':
                 # Check if the bin will fit in the octave band, if not discard the current octave band
                 # print "  band too low @%dHz for bin %d at %dHz - skip it" % (intervalUpper, bincount, bincount*BINBANDWIDTH)
                 continue
             else:
                 # Check how many bins will comprise this octave band (must be at least one)
-                while (bincount+1)*BINBANDWIDTH <= intervalUpper:
+                while (bincount+1)*bandwidth <= intervalUpper:
                     bincount    += 1
                 intervalUpperF.append( intervalUpper )
                 centres.append( fcentre )
@@ -588,8 +2019,11 @@ class AudioProcessor(AudioData):
 
 
     def VU(self, channel):
+        return self.rmsVU(self.samples[channel])
+
+    def rmsVU(self, samples):
         # Use full framesize, normalize AFTER squaring/before mean for consistency
-        normalized_data = self.samples[channel] / maxValue
+        normalized_data = samples / self.config.fullscale
         
         # Calculate RMS
         rms = np.sqrt(np.mean(np.square(normalized_data)))
@@ -599,19 +2033,25 @@ class AudioProcessor(AudioData):
         return min(1.0, rms / VUGAIN)
 
 
-    def reduceSamples(self, channel, reduceby, rms=True ):
-        # reduce the sample window to the size available
-        normalised_samples = self.samples[channel]/ maxValue  #[:FRAMESIZE//2]
-        if reduceby == 0: reduceby = 1
-        end = reduceby * int(len(normalised_samples)/ reduceby)
-        # reshaped_samples   = np.mean( normalised_samples[:end].reshape(-1, reduceby), axis=1)
-        rms_reshaped_samples   = np.sqrt( np.mean( np.square(normalised_samples[:end].reshape(-1, reduceby)), axis=1))/0.2
-        reshaped_samples       = np.mean( normalised_samples[:end].reshape(-1, reduceby), axis=1)/0.2
-        # print("AudioProcessor.reduceSamples by", reduceby, "from", len(normalised_samples), "to", len(reshaped_samples), "length", length)
-        if rms:
-            return rms_reshaped_samples.tolist()
-        else:
-            return reshaped_samples.tolist()
+    def envelope(self, channel, factor, kind='minmax', scale=1.0, cutoff=None, type='lowpass'):
+        """
+        The samples of a channel normalised and decimated by factor into a float32 envelope, see SampleEnvelope,
+        optionally of the samples filtered continuously by the filter bank.  Computed once per audio frame, the array
+        is reused for the next frame
+        """
+        key = (channel, factor, kind, scale, cutoff, type)
+        env = self.envelopes.get(key)
+        if env is None or env.seq != self.audio_seq:
+            samples = self.samples[channel] if cutoff is None else self.filtered(channel, cutoff, type=type)
+            if env is None or env.length != len(samples):
+                env = self.envelopes[key] = SampleEnvelope(len(samples), factor, kind, scale / self.config.fullscale)
+            env.compute(samples)
+            env.seq = self.audio_seq
+        return env.out
+
+    def reduceSamples(self, channel, reduceby, rms=True, cutoff=None, type='lowpass'):
+        # reduce the sample window to the RMS or mean of each group, scaled so 0.2 of full scale reads 1.0
+        return self.envelope(channel, reduceby, 'rms' if rms else 'mean', scale=1/0.2, cutoff=cutoff, type=type)
 
 
     """ use this to shift the noise floor eg: RMS 20 - 5000 -> 0->5000"""
@@ -658,11 +2098,11 @@ class AudioProcessor(AudioData):
         """
         # 1. Apply Window/Slice: (Make sure your window is applied as efficiently as possible)
         # If self.window is already the correct length (FRAMESIZE//2), this is fine.
-        windowed_data = data[:FRAMESIZE//2] * self.window 
+        windowed_data = data[:self.config.frame] * self.window 
         
         # 2. Apply Zero Padding:
         # If the length is not a power of 2, FFT is much slower. Ensure (FRAMESIZE//2 + NUMPADS) is a power of 2.
-        padded_len = FRAMESIZE//2 + NUMPADS
+        padded_len = self.config.nfft
         
         # 3. Use rfft for a ~2x speedup on real-valued data
         # Specify the exact FFT length using 'n' to include the padding
@@ -672,37 +2112,63 @@ class AudioProcessor(AudioData):
         # spectrum = np.abs(spectrum) / maxValue
         # The magnitude of an rfft bin for a pure sine wave of amplitude A is (A * N / 2), where N is the number of samples (FRAME).
         # To normalize a bin to ~1.0 for a full-scale sine wave, we divide by (maxValue * FRAME / 2).
-        spectrum = np.abs(spectrum) / (maxValue * (FRAME / 2.0))
+        spectrum = np.abs(spectrum) / (self.config.fullscale * (self.config.frame / 2.0))
         
         
         return spectrum
 
 
-    def packFFT(self, intervalUpperF, channel='left'):
+    def bandPlan(self, intervalUpperF):
+        """
+        Return the BandPlan for the upper band frequencies from createBands, do this once rather than every frame.
+        Frames asking for the same banding share one plan, so their packFFT results are shared too
+        """
+        key = tuple(intervalUpperF)
+        if key not in self.band_plans:
+            if self.band_engine == 'cqt':
+                self.band_plans[key] = ConstantQPlan(intervalUpperF, self.fft.bins, self.lowband, self.config.binbandwidth)
+            elif self.lowband:
+                self.band_plans[key] = MultiResolutionPlan(intervalUpperF, self.fft.bins, self.lowband, self.config.binbandwidth)
+            else:
+                self.band_plans[key] = BandPlan(intervalUpperF, self.fft.bins, self.config.binbandwidth)
+        return self.band_plans[key]
+
+    def packFFT(self, plan, channel='left'):
         '''
         # Pack bins into octave intervals
         # Convert amplitude into dBs
+        # plan is a BandPlan, MultiResolutionPlan or ConstantQPlan, or the upper band frequencies from createBands (slower, as the plan is looked up each call)
+        # returns a read only float32 array of normalised levels 0.0 - 1.0, memoised per plan, channel and audio frame
         '''
-        bins = self.bins[channel]
-
-        startbin = 1 #do not use bin[0] which is DC
-        spectrumBands = []
-
-        for band in intervalUpperF:  # collect bins at a time
-            bincount    = startbin
-
-            while bincount*BINBANDWIDTH <= band:
-                bincount    += 1
+        if not isinstance(plan, (BandPlan, MultiResolutionPlan, ConstantQPlan)):
+            plan = self.bandPlan(plan)
+
+        cached = self.band_cache.get((plan, channel))
+        if cached is not None and cached[0] == self.audio_seq:
+            self.band_hits += 1
+            return cached[1]
+        self.band_misses += 1
+
+        # Use standard audio dB calculation (log10) since bins are now normalised 0.0 - 1.0
+        if isinstance(plan, ConstantQPlan):
+            # one sparse matmul packs every channel, the others are kept for the rest of this audio frame
+            cached = self.cq_cache.get(plan)
+            if cached is None or cached[0] != self.audio_seq:
+                cached = self.cq_cache[plan] = (self.audio_seq, plan.pack(self.bins))
+            packed = cached[1][channel]
+        elif isinstance(plan, MultiResolutionPlan):
+            packed = plan.pack(self.bins[channel], self.bins['low_' + channel])
+        else:
+            packed = plan.pack(self.bins[channel])
+        levels = 20*np.log10(packed + 1e-7)
+        levels = self.normalise(levels).astype(np.float32)
+        levels.flags.writeable = False      # shared between every frame displaying this banding
 
-            # Use standard audio dB calculation (log10) since bins are now normalised 0.0 - 1.0
-            level = 20*np.log10((bins[startbin:bincount].mean() + 1e-7))
-            spectrumBands.append( self.normalise(level) )
-            startbin = bincount
-        # print("PackFFT >", spectrumBands)
-        return spectrumBands
+        self.band_cache[(plan, channel)] = (self.audio_seq, levels)
+        return levels
 
     def normalise(self, level):
-        """ convert from dB into a percentage """
+        """ convert from dB into a percentage, level can be a single value or an array of band levels """
         """ need to calibrate this more carefully """
         # print("AudioProcessor.normalise > input level ", level)
         self.dynamicRange(level)
@@ -714,8 +2180,8 @@ class AudioProcessor(AudioData):
         scale = max(0.001, self.peakC + floor)
         
         # Calculate percentage and clamp exactly to [0.0, 1.0]
-        pc = (floor + level) / scale
-        return max(0.0, min(1.0, pc))
+        pc = (floor + np.asarray(level)) / scale
+        return np.clip(pc, 0.0, 1.0)
 
     def printSpectrum(self, octave, intervalUpperF, left=True):
         FFACTOR = math.pow(2, 1.0/float(2*octave) )
@@ -750,7 +2216,12 @@ class AudioProcessor(AudioData):
         return self.getSpectrum(left=False)
 
     def dynamicRange(self, level):
-        # assume input is a level in dB - calc the dynamicRange
+        # assume input is a level (or an array of levels) in dB - calc the dynamicRange
+        if np.ndim(level):
+            if len(level) == 0: return
+            self.dynamicRange(np.max(level))
+            level = np.min(level)
+
         text = ""
         change = False
         if level > self.peakC:
@@ -769,22 +2240,53 @@ class AudioProcessor(AudioData):
     def rmsPower(self, y):
         return np.abs(np.mean(np.square(y)))
 
+    def latency(self):
+        """
+        Worst case delay in ms from a sample arriving at the soundcard to it being reflected in the analysis:
+        the stream input latency, waiting for the capture buffer or hop to fill, and the FFT window group delay
+        (half the analysed window, as the most recent samples are analysed)
+        """
+        report = {'input'  : self.source.latency()*1000 if self.source else 0.0,
+                  'capture': self.capture_frames / self.config.rate * 1000,
+                  'hop'    : (self.stft.hop if self.stft else self.capture_frames) / self.config.rate * 1000,
+                  'window' : self.fft.size / self.config.rate * 1000 / 2 }
+        report['total']  = report['input'] + max(report['capture'], report['hop']) + report['window']
+        report['rate']   = 1 / self.analysis_period
+        return report
+
+    def latency_report(self):
+        l = self.latency()
+        return "Audio to analysis latency %.1fms (input %.1fms, capture %.1fms, hop %.1fms, window %.1fms), analysis at %.0fHz" % \
+               (l['total'], l['input'], l['capture'], l['hop'], l['window'], l['rate'])
+
     def processstatus(self):
         text  = "Process audio> signal det %s" % self.signal_detected
         text += "\n L%10f-^%10f^%10f\t%10f R"% (self.vu['left'], self.peak['left'], self.peak['right'], self.vu['right'])
         text += "\n Peak Spectrum L:%f, R:%f" % (max(self.bins['left']), max(self.bins['right']) )
+        text += "\n %s" % self.audio_ring
+        text += "\n %s" % self.latency_report()
+        if self.stft: text += "\n %s" % self.stft
+        if self.lowband: text += "\n %s" % self.lowband
+        text += "\n Band packing: %d plans, hits %d, misses %d" % (len(self.band_plans), self.band_hits, self.band_misses)
+        if self.dsp_worker: text += "\n %s" % self.dsp_worker
+        if self.dsp_engine: text += "\n %s" % self.dsp_engine
         return text
 
     """ Butterworth digital filters """
-    def butterworth_coeffs(self, cutoff, order=5,type='lowpass'):
-        #btype{‘lowpass’, ‘highpass’, ‘bandpass’, ‘bandstop’}
-        # cutoff in Hz
-        return butter(order, cutoff, fs=RATE, btype=type, analog=False)
-
     def filter(self, data, cutoff, order=5, type='lowpass'):
-        b, a = self.butterworth_coeffs(cutoff, order=order, type=type)
-        y = lfilter(b, a, data)
-        return y
+        """ Filter one array on its own, without state between calls.  cutoff in Hz """
+        return sosfilt(FilterBank.design(self.config.rate, cutoff, order, type), data)
+
+    def filtered(self, channel, cutoff, order=5, type='lowpass'):
+        """
+        The latest frame of a channel through a filter run continuously on the capture, the filter is added to the
+        bank on the first call.  With the DSP in its own process the capture is not here, so the frame is filtered alone
+        """
+        if self.dsp_engine:
+            return self.filter(self.samples[channel], cutoff, order, type)
+
+        band = self.filters.add(cutoff, order, type)
+        return self.filters.get(band, None if channel == 'mono' else SHARED_CHANNELS.index(channel))
 
 
 
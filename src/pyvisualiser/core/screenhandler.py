@@ -5,7 +5,7 @@
 
     This module manages the events and screen changes
 """
-from    pyvisualiser.core.processaudio import AudioProcessor
+from    pyvisualiser.core.processaudio import AudioProcessor, AudioConfig
 from    pyvisualiser.endpoints.roon import Roon
 from    pyvisualiser.core.displaydriver import GraphicsDriver
 
@@ -73,7 +73,13 @@ class HWInterface():
 class Platform(AudioProcessor, MetaData, GraphicsDriver, HWInterface):
     def __init__(self, events, hw_platform):
         GraphicsDriver.__init__(self, events, gfx=hw_platform['gfx'])
-        AudioProcessor.__init__(self, events, device=hw_platform['loopback'])
+        AudioProcessor.__init__(self, events, device=hw_platform['loopback'], dsp_thread=hw_platform.get('dsp_thread', False), dsp_process=hw_platform.get('dsp_process', False), \
+                                analyser=hw_platform.get('analyser', 'aubio'), capture_frames=hw_platform.get('capture_frames'), hop=hw_platform.get('stft_hop'), \
+                                lowband=hw_platform.get('lowband', False), band_engine=hw_platform.get('band_engine', 'fft'), \
+                                source=hw_platform.get('source'), ballistics=hw_platform.get('ballistics', True), \
+                                fft_workers=hw_platform.get('fft_workers'), \
+                                config=AudioConfig(hw_platform.get('rate', 44100), format=hw_platform.get('format', 'int16'), \
+                                                   fast_len=hw_platform.get('fft_fast_len', False)))
         MetaData.__init__(self, events, maxwh=self.wh, target_name=hw_platform['roon_zone'])
         HWInterface.__init__(self)
 
@@ -206,6 +212,7 @@ class ScreenController:
         self.events.Screen('set', self.startScreen)
         self.events.Control('start')
         loop_count = 0
+        features_screen = None      # the screen the audio features were last selected for
         CRITICAL_LOOPTIME = (1024000/44100)
         FPS = 50
         print("ScreenController.run> startup configured")
@@ -216,28 +223,40 @@ class ScreenController:
             
             if self.activeScreen != 'exit':  
 
-                # 1. Drain all pending audio frames from the queue (non-blocking)
-                #    If there's multiple chunks, process them to catch up.
+                # 1. Pick up the latest audio results (non-blocking)
                 audio_processed_ms = 0.0
                 start_audio = time.perf_counter()
                 
-                # is_audio_available() grabs one chunk off the queue and updates mono/left/right structures
                 # Because audio buffer comes in chunks like 2048 at 44.1kHz (21 FPS),
-                # we only want to process what has arrived, but draw regardless to preserve smooth 60fps UI decay
+                # we only want to use what has arrived, but draw regardless to preserve smooth 60fps UI decay
                 did_audio_update = False
-                while self.platform.is_audio_available():
-                    self.platform.process() 
-                    self.platform.data_available = False # Reset the flag
-                    self.audioready = 0
-                    did_audio_update = True
+                if self.platform.dsp_worker or self.platform.dsp_engine:
+                    # The DSP runs on its own thread or process, just read the latest published results
+                    did_audio_update = self.platform.read_snapshot()
+                else:
+                    # is_audio_available() grabs one chunk off the ring and updates mono/left/right structures
+                    # If there's multiple chunks, process them to catch up.
+                    while self.platform.is_audio_available():
+                        self.platform.process() 
+                        self.platform.data_available = False # Reset the flag
+                        self.audioready = 0
+                        did_audio_update = True
                     
                 processing_time_ms = (time.perf_counter() - start_audio) * 1000
 
+                # finalise a recording the capture path has flagged as over its time limit
+                self.platform.poll_recording()
+
                 # 2. Draw and Render the Frame
                 start_draw = time.perf_counter()
                 
                 # build and update the display
                 screen = self.screens[self.activeScreen]
+
+                # only compute the audio features the frames on this screen use
+                if features_screen is not screen:
+                    self.platform.set_features(screen.required_features())
+                    features_screen = screen
                 title = screen.title + " > " + type(screen).__name__ if hasattr(screen, 'title') else type(screen).__name__
                 self.events.Control('loop_start', text=title)
 
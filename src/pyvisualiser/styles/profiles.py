@@ -86,6 +86,9 @@ class VisualiserProfile:
     fullscreen: bool = False
     framerate: int = 60
     
+    # Compact GPU instance records (byte colours, half floats) for shared memory GPUs, eg Pi 4
+    packed_instances: bool = False
+    
     # Global default palette name
     default_palette: str = 'std'
     
@@ -11,6 +11,7 @@ class EchoWaveFrame(Frame):
     3D effect where waves of amplitude traverse the screen and look like echos 
     going behind them.
     """
+    requires = set()
     @property
     def type(self): return 'Visualiser'
 
@@ -31,9 +32,10 @@ class EchoWaveFrame(Frame):
         if waveform is None or len(waveform) == 0 or self.w <= 0:
             return
             
-        # Downsample waveform to match screen width roughly if it's huge
+        # Peak envelope of each group of samples, roughly one per pixel, so the hills do not alias.
+        # Copied as the envelope is reused for the next audio frame
         step = max(1, len(waveform) // self.w)
-        reduced_wave = waveform[::step]
+        reduced_wave = self.platform.envelope(self.channel, step, 'peak').copy()
         
         self.wave_history.insert(0, reduced_wave)
         if len(self.wave_history) > self.history_size:
@@ -46,7 +48,7 @@ class EchoWaveFrame(Frame):
         
         self.draw_background(True)
 
-        max_amp = 32768.0
+        max_amp = 1.0   # the envelope is normalised
         
         # Baseline is at the bottom of the frame
         rect = self.abs_rect()
@@ -70,19 +72,15 @@ class EchoWaveFrame(Frame):
             rgb = self.colours.get(col_idx)
             colour = list(rgb[:3]) + [int(alpha)]
 
-            points = []
             x_step = self.w / (len(wave) or 1)
-            
-            for idx, val in enumerate(wave):
-                px = start_x + x_offset + (idx * x_step * scale)
-                # Draw upwards from the baseline
-                norm_val = abs(val) / max_amp # Use absolute value for "hills"
-                py = bottom_y - y_offset - (norm_val * (self.h * 0.6) * scale)
-                points.append((px, py))
+            points = np.empty((len(wave), 2))
+            points[:, 0] = start_x + x_offset + np.arange(len(wave)) * x_step * scale
+            # Draw upwards from the baseline, absolute values for "hills"
+            points[:, 1] = bottom_y - y_offset - (np.abs(wave) / max_amp * (self.h * 0.6) * scale)
 
             if len(points) > 1:
                 # Use a slightly thicker, softer line for the "neon" look
-                self.platform.renderer.draw_lines(colour, False, points, width=1, softness=0.0)
+                self.platform.renderer.draw_polyline(colour, points, width=1, softness=0.0)
         
         return True
 
@@ -91,6 +89,8 @@ class KaleidoscopeFrame(Frame):
     """
     A glowing, shader-like starburst mirrored 4 times in a kaleidoscope pattern.
     """
+    requires = {'bins'}
+
     @property
     def type(self): return 'Visualiser'
 
@@ -196,6 +196,8 @@ class PulseOrbFrame(Frame):
     """
     Colourful turning ball pulsing growing and shrinking with pulses or dots coming off.
     """
+    requires = {'vu'}
+
     @property
     def type(self): return 'Visualiser'
 
@@ -303,6 +305,8 @@ class SpectrumWaveFrame(Frame):
     """
     3D effect where waves of spectrum data traverse the screen, similar to EchoWave.
     """
+    requires = {'bins'}
+
     @property
     def type(self): return 'Visualiser'
 
@@ -326,6 +330,7 @@ class SpectrumWaveFrame(Frame):
             self.bar_freqs = self.platform.createBands(spacing, flast=self.platform.w * 10)
             if len(self.bar_freqs) <= self.w:
                 break
+        self.band_plan = self.platform.bandPlan(self.bar_freqs)
 
     def update_history(self, spectrum_data):
         """Updates the spectrum history buffer."""
@@ -341,7 +346,7 @@ class SpectrumWaveFrame(Frame):
         if len(self.bar_freqs) > self.w * 1.2 or len(self.bar_freqs) < self.w / 2:
             self._calculate_bar_freqs()
 
-        spectrum_data = self.platform.packFFT(self.bar_freqs, self.channel)
+        spectrum_data = self.platform.packFFT(self.band_plan, self.channel)
         self.update_history(spectrum_data)
         
         # self.draw_background(True)
@@ -362,16 +367,13 @@ class SpectrumWaveFrame(Frame):
             rgb = self.colours.get(col_idx)
             colour = list(rgb[:3]) + [int(alpha)]
 
-            points = []
             x_step = self.w / (len(wave) or 1)
-            
-            for idx, val in enumerate(wave):
-                px = start_x + x_offset + (idx * x_step * scale)
-                py = bottom_y - y_offset - (val * (self.h * 0.8) * scale)
-                points.append((px, py))
+            points = np.empty((len(wave), 2))
+            points[:, 0] = start_x + x_offset + np.arange(len(wave)) * x_step * scale
+            points[:, 1] = bottom_y - y_offset - (np.asarray(wave) * (self.h * 0.8) * scale)
 
             if len(points) > 1:
-                self.platform.renderer.draw_lines(colour, False, points, width=1, softness=0.0)
+                self.platform.renderer.draw_polyline(colour, points, width=1, softness=0.0)
         
         return True
 
@@ -382,6 +384,8 @@ class FreqWaveFrame(Frame):
     New data appears on the right and scrolls left.
     Supports 'rms' (single line) or 'spectrum' (multiple lines).
     """
+    requires = {'bins', 'vu'}
+
     @property
     def type(self): return 'Visualiser'
 
@@ -409,8 +413,9 @@ class FreqWaveFrame(Frame):
                     break
             if not self.bar_freqs:
                 self.bar_freqs = self.platform.createBands(1)
+            self.band_plan = self.platform.bandPlan(self.bar_freqs)
 
-        data = self.platform.packFFT(self.bar_freqs, self.channel)
+        data = self.platform.packFFT(self.band_plan, self.channel)
         
         # Resample/Select bands to match num_bands
         if len(data) < self.num_bands:
@@ -455,10 +460,16 @@ class FreqWaveFrame(Frame):
         h = rect[3]
         
         num_lines = len(self.history[0])
+
+        # Newest first, x steps left until the first point beyond the frame
+        history = np.array(self.history[::-1], dtype=float)
+        steps   = np.arange(len(history))
+        xs      = right_x - steps * self.speed
+        beyond  = np.flatnonzero(xs < rect[0])
+        count   = beyond[0] + 1 if len(beyond) else len(history)
+        scales  = self.perspective_scale ** steps[:count]
         
         for line_idx in range(num_lines):
-            points = []
-            
             # Determine Color
             if self.mode == 'rms':
                 colour = self.colours.get('light')
@@ -467,17 +478,12 @@ class FreqWaveFrame(Frame):
                 col_idx = (line_idx / (num_lines or 1)) * self.colours.num_colours
                 colour = self.colours.get(col_idx)
 
-            # Build Polyline
-            for i, data_snapshot in enumerate(reversed(self.history)):
-                val = data_snapshot[line_idx]
-                scale = self.perspective_scale ** i
-                x = right_x - (i * self.speed)
-                y = bottom_y - (i * self.y_step) - (val * h * 0.9 * scale) # 90% height usage
-                points.append((x, y))
-                
-                if x < rect[0]: break
+            # Build Polyline, 90% height usage
+            points = np.empty((count, 2))
+            points[:, 0] = xs[:count]
+            points[:, 1] = bottom_y - steps[:count] * self.y_step - history[:count, line_idx] * h * 0.9 * scales
             
             if len(points) > 1:
-                self.platform.renderer.draw_lines(colour, False, points, width=self.line_width)
+                self.platform.renderer.draw_polyline(colour, points, width=self.line_width)
 
         return True
\ No newline at end of file
@@ -36,6 +36,7 @@ def look_at_matrix(eye, target, up):
     ], dtype='f4')
 
 class Kalidoscope(GLSLFrame):
+    requires = {'bins', 'vu'}
     def __init__(self, parent, **kwargs):
         super().__init__(parent, "kalidoscope", **kwargs)
 
@@ -65,6 +66,7 @@ class Kalidoscope(GLSLFrame):
             self.prog['u_bass'].value = float(bass)
 
 class SpectrumMesh(GLSLFrame):
+    requires = {'bins', 'vu'}
     def __init__(self, parent, **kwargs):
         super().__init__(parent, "spectrum_mesh", **kwargs)
         self.render_mode = moderngl.LINES
@@ -145,6 +147,7 @@ SHADERS = ["baltro", "cloudflight", "discosun", "kalidoscope", "pinkball", "spir
 ANALYSIS_METADATA = ["beat", "bpm","centroid", "kurtosis","flux","volume"]
 
 class GLshader(GLSLFrame):
+    requires = {'vu', 'bass', 'beat', 'analysis'}
     def __init__(self, parent, shader="baltro", **kwargs):
         super().__init__(parent, shader, **kwargs)
 
@@ -25,6 +25,7 @@ class TextFrame(Frame):
         - V is the vertical alignment
         - Y is the y scaler
     """
+    requires = set()
     def __init__(self, parent, scalers=None, align=None, text='Default Text', reset=True, theme=None, wrap=False, \
                  colour='foreground', justify='centre', background=None, outline=None, padding=0, update_fn=None, z_order=0):
         
@@ -79,6 +80,7 @@ MetaData Frames
 
 class PlayProgressFrame(Frame):
     """ This creates a propgress bar that moves according to play progress with time elapsd and time to go calc """
+    requires = set()
     def __init__(self, parent, scalers=None, align=None, barsize_pc=0.5, theme=None, flip=False, outline=None,\
                     led_h=1, led_gap=0, radius=0, barw_min=10, barw_max=400, tip=True, orient='horz', background=None, z_order=10, **kwargs):
 
@@ -152,6 +154,7 @@ class MetaData(TextFrame):
     
 
 class MetaDataFrame(Frame):
+    requires = set()
     SHOW = { 'track' : {'colour' : 'foreground', 'align': ('left','middle'), 'scalers': (1.0, 1.0)}, \
              'album' : {'colour' : 'mid',        'align': ('left','middle'), 'scalers': (1.0, 0.8)},  \
              'artist': {'colour' : 'mid',        'align': ('left','middle'), 'scalers': (1.0, 0.8) } }
@@ -178,6 +181,7 @@ Image based meta data frames
 class ArtFrame(Frame):
     # OUTLINE = { 'width' : 3, 'radius' : 0, 'colour_index' : 'foreground'}
     # def __init__(self, parent, update_fn=None, square=False, scalers=None, align=None, opacity=None, outline=None, padding=0, background=None):
+    requires = set()
     def __init__(self, parent, update_fn=None, opacity=150, reflection=None, **kwargs):
 
         # Frame.__init__(self, parent, scalers=scalers, align=align, outline=outline, padding=padding, background=background, square=square)
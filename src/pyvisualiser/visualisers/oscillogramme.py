@@ -26,10 +26,11 @@ Visualiser Frames create complex responses to the audio:
 
 """
 
-from    pyvisualiser.core.framecore  import Frame, Smoother
+from    pyvisualiser.core.framecore  import Frame, SmootherBank
 from    pyvisualiser.core.components import Bar, Text, Line, Box, Image, ArcsOctaves, Dots, BarEffects, BarStyle, SpectrumStyle
 from    pyvisualiser.styles.presets  import PI, Centred
 from    pyvisualiser.styles.styles   import OscillogrammeStyle, BarStyle
+import  numpy as np
 
 
 class OscilogrammeBar(Frame):
@@ -50,6 +51,7 @@ class OscilogrammeBar(Frame):
         tip         - is a curved end to the bar
         decay       - is a time constant for how quickly a bar falls down
     """
+    requires = set()
 
 
     def __init__(self, parent, channel, scalers=None, align=None, theme=None, background=None, outline=None,
@@ -83,7 +85,7 @@ class OscilogrammeBar(Frame):
             gaptofill = self.width-oscillograme_width
             self.bar_gap = self.bar_gap+ gaptofill/self.bars
 
-        self.current  = [ Smoother(1.0) for i in range(self.bars)]    #array of smoothers
+        self.current  = SmootherBank(self.bars, 1.0)    # smoothing and decay of every bar
         # bar_style = BarStyle(led_h=led_h, led_gap=led_gap, flip=flip, radius=radius, tip=tip, colour_mode='horz')
         self.bar      = Bar(self, box_size=(self.width, self.h), style=self.bar_style)
         self.decay    = self.oscillograme.decay
@@ -99,21 +101,12 @@ class OscilogrammeBar(Frame):
 
     def update_screen(self):
         samples =  self.platform.reduceSamples( self.channel, self.reduce_by )
-        for i in range(self.bars):
-            # add the new sample
-            target_height = min(1.0, samples[i])
-            # print(target_height)
-            if target_height > self.current[i].smoothed():
-                self.current[i].add(target_height)
-            
-            # decay the existing ones
-            if self.current[i].smoothed() < self.decay/100.0:
-                self.current[i].add(0.0)
-            else:
-                self.current[i].add(self.current[i].smoothed()* (1- self.decay))
-
-            x = i * (self.barw + self.bar_gap)
-            self.bar.draw( x, self.current[i].smoothed(), self.barw, colour_index=x)
+
+        # add the new samples and decay the existing ones
+        self.current.track(np.minimum(1.0, samples[:self.bars]), self.decay)
+
+        x = np.arange(self.bars) * (self.barw + self.bar_gap)
+        self.bar.draw_many(x, self.current.smoothed(), self.barw, colour_indices=x)
         return True
         
 
@@ -122,6 +115,7 @@ class Oscilogramme(Frame):
     """
     Draw a frame of samples - scaling the number of samples is the trick to align the frame rate and the sample rate
     """
+    requires = set()
     def __init__(self, parent, channel, scalers=None, align=('left', 'bottom'), theme=None, background=None, z_order=0, **kwargs):
         self.channel = channel
         Frame.__init__(self, parent, scalers=scalers, align=align, theme=theme, background=background, z_order=z_order)
@@ -145,6 +139,7 @@ class Oscilogramme(Frame):
 
 
 class CircleModulator(Frame):
+    requires = {'beat', 'vu'}
     def __init__(self, parent, channel, scalers=None, align=None, theme=None):
         self.channel = channel
         Frame.__init__(self, parent, scalers=scalers, align=align, theme=theme, square=False)
@@ -164,9 +159,9 @@ class CircleModulator(Frame):
         # self.draw_background(True)
 
         height, peaks = self.VU.read()
-        samples = self.platform.reduceSamples( self.channel, self.platform.framesize//(self.w//2), rms=False )  # reduce the dataset quite a bit
-        # high_samples = self.platform.filter( samples, hpf_freq, type='highpass' )
-        low_samples = self.platform.filter( samples, lpf_freq, type='lowpass' )
+        # low pass the continuous signal before reducing the dataset quite a bit
+        low_samples = self.platform.reduceSamples( self.channel, self.platform.framesize//(self.w//2), rms=False, cutoff=lpf_freq )
+        # high_samples = self.platform.reduceSamples( self.channel, self.platform.framesize//(self.w//2), rms=False, cutoff=hpf_freq, type='highpass' )
         self.lines.draw_mod_line(low_samples, amplitude=0.5, gain=0.1, colour=height*self.h/2)
         self.dots.draw_mod_dots(low_samples, trigger=self.platform.trigger_detected, amplitude=0.1, gain=0.1, colour='alert')
         # self.ripples.draw_mod_ripples(low_samples, trigger=self.platform.trigger_detected, amplitude=height)
@@ -176,6 +171,7 @@ class CircleModulator(Frame):
 # Subframe to drawn two spectrums flipped on top        
 class SamplesFrame(Frame):
     """ Volume/Source on left - Spectrum on left - one channel """
+    requires = set()
     def __init__(self, parent, scalers=(1.0, 1.0), align=('centre','middle'), theme='std'):
         Frame.__init__(self, parent, scalers=scalers, align=align)
         self.create()
@@ -6,6 +6,7 @@ from pyvisualiser.visualisers.frames     import SpectrumFrame, TextFrame
 """ old preamp screens that need refactoring """
 class MainScreen(Frame):
     """ Vol/source in centre - spectrum left and right """
+    requires = set()
     def __init__(self, platform):
         Frame.__init__(self, platform)
         self += SpectrumFrame(self  ,  'left', 0.3 )
@@ -13,6 +14,7 @@ class MainScreen(Frame):
         self += SpectrumFrame(self  ,  'right', 0.3 )
 
 class ScreenTitle(Frame):
+    requires = set()
     def __init__(self, platform):
         Frame.__init__(self, platform)
         self += MenuFrame(self  , 'top', 1.0, 'very very long screen title')
@@ -20,6 +22,7 @@ class ScreenTitle(Frame):
 
 class WelcomeScreen(Frame):
     """ Startup screen """
+    requires = set()
     text = "Welcome to SRC Visualiser"
     def __init__(self, platform):
         Frame.__init__(self, platform)
@@ -28,6 +31,7 @@ class WelcomeScreen(Frame):
 
 class ShutdownScreen(Frame):
     """ Startup screen """
+    requires = set()
     text = "Loved the music"
 
     def __init__(self, platform):
@@ -37,11 +41,13 @@ class ShutdownScreen(Frame):
 
 class ScreenSaver(Frame):
     """ force the screen to go blank """
+    requires = set()
     def __init__(self, platform):
         Frame.__init__(self, platform)
         self += TextFrame( platform, 'top', 1.0, '')
 
 class VolChangeScreen(Frame):
+    requires = set()
     def __init__(self, platform):
         Frame.__init__(self, platform)
         self += VolumeAmountFrame(self  , 0.6)
@@ -49,6 +55,7 @@ class VolChangeScreen(Frame):
         self.check()
 
 class RecordingScreen(Frame):
+    requires = set()
     def __init__(self, platform):
         Frame.__init__(self, platform)
         self += RecordFrame( platform, 0.3)
@@ -56,6 +63,7 @@ class RecordingScreen(Frame):
         self.check()
 
 class RecordFinishScreen(Frame):
+    requires = set()
     def __init__(self, platform):
         Frame.__init__(self, platform)
         self += TextFrame( platform, 'top', 0.5, 'Recording saved to')
@@ -63,6 +71,7 @@ class RecordFinishScreen(Frame):
         self.check()
 
 class SourceVolScreen(Frame):   # comprises volume on the left, spectrum on the right
+    requires = set()
     def __init__(self, platform):
         Frame.__init__(self, platform)
         self += dbVolumeSourceFrame(self  , 0.4, 'right')
@@ -70,6 +79,7 @@ class SourceVolScreen(Frame):   # comprises volume on the left, spectrum on the
         self.check()
 
 class SourceVUVolScreen(Frame):
+    requires = set()
     def __init__(self, platform):
         Frame.__init__(self, platform)
         self += dbVolumeSourceFrame(self  , 0.4, 'right')
@@ -86,6 +96,7 @@ class VolumeSourceFrame(Frame):
         Displays the volume as a percentage with the source underneath
         - has a width determined by the scale
     """
+    requires = set()
     def __init__(self, parent, scale, align=('right','top')):
         Frame.__init__(self, display.boundary, platform, (scale,1.0), 'middle', Halign=align)
         self += VolumeTextFrame(self, "top", 0.7, "22")        # this are the widest number
@@ -102,6 +113,7 @@ class RecordFrame(Frame):
         Displays the volume as a percentage with the source underneath
         - has a width determined by the scale
     """
+    requires = set()
     def __init__(self, parent, scale):
         Frame.__init__(self, display.boundary, platform, (scale,1.0), 'middle', 'left')
         self +=  TextFrame( display.boundary, platform, 'middle', 1.0, 'Recording', X=0.6, align=('left','middle'))
@@ -120,6 +132,7 @@ class dbVolumeSourceFrame(Frame):
         Displays the volume as a percentage with the source underneath
         - has a width determined by the scale
     """
+    requires = set()
     def __init__(self, parent, scale, align=('right','top')):
         Frame.__init__(self, display.boundary, platform, scalers=scalers(scale, 1.0), align=align)
         self += dbVolumeTextFrame(self, align=('right','top'), Y=0.7, text='-64.0dB')        # this are the widest number
@@ -135,6 +148,7 @@ class VolumeAmountFrame(Frame):
     """
         Displays a triangle filled proportional to the Volume level
     """
+    requires = set()
     def __init__(self, parent, scale):
         Frame.__init__(self, parent, scalers=scalers(scale,0.5), align=('left', 'middle'))
 
@@ -185,6 +199,7 @@ class SourceIconFrame(Frame):
     """
         Displays a an Icon for the source type and animates it
     """
+    requires = set()
     def __init__(self, parent, scale, align) :  # size is a scaling factor
         Frame.__init__(self, parent, scalers=(scale,1.0), align=('centre', 'middle'))
         self.files          = {}  # dictionary of files to images
@@ -12,9 +12,10 @@
  v3.0 Baloothebear4 Dec 23 - Refactored for MacOS & DSI Display usage
 
 """
-from    pyvisualiser.core.framecore  import Frame, Smoother, RowFramer, ColFramer
+from    pyvisualiser.core.framecore  import Frame, SmootherBank, RowFramer, ColFramer
 from    pyvisualiser.core.components import Bar, Text, Line, Box, Image, ArcsOctaves, Dots, BarStyle, SpectrumStyle
 from    pyvisualiser.styles.presets  import PI, Centred
+import  numpy as np
 
 
 """
@@ -25,75 +26,72 @@ class Spectrum:
     PEAKDECAY = 0.01  # pc of Decay to use for peak bars
 
 
+    layouts   = {}    # bar layouts by (width, style, band plan), shared by every spectrum of that size on that platform
+
     def __init__(self, width, barsize_pc=0.5, barw_min=1, barw_max=20, bandwidth=None, decay=DECAY):
         self.barsize_pc      = barsize_pc     # pc of barwidth
         self.barw_min       = barw_min      # min widths
         self.barw_max       = barw_max      # max width
         self.decay          = decay
         self.peak_decay     = decay * Spectrum.PEAKDECAY
+
+        key = (width, barsize_pc, barw_min, barw_max, bandwidth) + self.platform.band_key
+        if key not in Spectrum.layouts:
+            Spectrum.layouts[key] = self.fit_bars(width, bandwidth)
+        self.spacing, bar_freqs, self.barw, self.bar_gap, self.max_bars, octaves = Spectrum.layouts[key]
+
+        self.bar_freqs      = list(bar_freqs)
+        self.octaves        = list(octaves)
+        self.bars           = len(self.bar_freqs)
+        self.band_plan      = self.platform.bandPlan(self.bar_freqs)   # FFT bin ranges of each bar, worked out once
+
+        self.current        = SmootherBank(self.bars, 1.0)   # smoothing, decay and peak hold of every bar
+        self.peaks          = self.current.peaks             # This is used to hold the values and implement a smoothing factor
+        # print("Spectrum.__init__> Selected spectrum: octave spacing=1/%d, num octaves %d, bar width %d" % (self.spacing, len(self.octaves),self.barw))
+
+    def fit_bars(self, width, bandwidth):
+        """ Returns the (spacing, bar_freqs, barw, bar_gap, max_bars, octaves) layout that fits the width """
         # Calculate how many bars can be drawn in the width available
         # Go down the bar widths to see what will fit
         # Determine the max octave fraction that can be accomodated
         # Set up the number function to pack the samples
 
-        for self.spacing in (48, 24, 12, 6, 3, 2, 1):   # 48th is the finest, go down from the finest to the coarsest to find one that fits
-            self.bar_freqs = self.platform.createBands(self.spacing, flast=bandwidth)
-            self.bars      = len(self.bar_freqs)
+        for spacing in (48, 24, 12, 6, 3, 2, 1):   # 48th is the finest, go down from the finest to the coarsest to find one that fits
+            bar_freqs = self.platform.createBands(spacing, flast=bandwidth)
+            bars      = len(bar_freqs)
             for barw in range(self.barw_max, self.barw_min, -1):
-                self.bar_gap    = int(barw * self.barsize_pc)
-                self.max_bars   = int(width/(self.bar_gap+barw))
-                if  self.bars <= self.max_bars: break
-            if  self.bars <= self.max_bars: break
+                bar_gap    = int(barw * self.barsize_pc)
+                max_bars   = int(width/(bar_gap+barw))
+                if  bars <= max_bars: break
+            if  bars <= max_bars: break
 
-        self.barw           = barw
-        spectrum_width = self.bars * (self.bar_gap+self.barw)
+        spectrum_width = bars * (bar_gap+barw)
         if spectrum_width < width:
             gaptofill = width-spectrum_width
             # print("gap to fill")
-            self.bar_gap = self.bar_gap+ gaptofill/self.bars
-
-        self.peaks          = [0.0] * self.bars  #This is used to hold the values and implement a smoothing factor
-        self.current        = [ Smoother(1.0) for i in range(self.bars)]    #array of smoothers
+            bar_gap = bar_gap+ gaptofill/bars
 
         #count num_octaves, as an Octave is a doubling of frequency
-        self.octaves = [0]
-        for freq_bin in range(1, len(self.bar_freqs)):
-            if self.bar_freqs[freq_bin] >= 2 * self.bar_freqs[self.octaves[-1]]:
-                if freq_bin - self.octaves[-1] < 12:
+        octaves = [0]
+        for freq_bin in range(1, len(bar_freqs)):
+            if bar_freqs[freq_bin] >= 2 * bar_freqs[octaves[-1]]:
+                if freq_bin - octaves[-1] < 12:
                     continue
                 else:
-                    self.octaves.append(freq_bin)
+                    octaves.append(freq_bin)
                     continue
-        # print("Spectrum.__init__> Selected spectrum: octave spacing=1/%d, num octaves %d, bar width %d" % (self.spacing, len(self.octaves),self.barw))
+
+        return spacing, tuple(bar_freqs), barw, bar_gap, max_bars, tuple(octaves)
 
 
 
     def read(self, channel='left'):
-        smoothedpeak = 0
-        fft = self.platform.packFFT(self.bar_freqs, channel)
+        """ Update the smoothed bar heights and peaks from the latest spectrum, returns the bar heights """
+        fft = self.platform.packFFT(self.band_plan, channel)
         # print("Spectrum.read> fft", fft)
 
-        for i, target_height in enumerate(fft):
-            if target_height > self.current[i].smoothed():
-                self.current[i].add(target_height)
-
-            if self.current[i].smoothed() > self.peaks[i]:
-                self.peaks[i] = self.current[i].smoothed()
-
-            height = self.current[i].smoothed()
-            if height > smoothedpeak: smoothedpeak = height
-
-            if self.current[i].smoothed() < self.decay/100.0:
-                self.current[i].add(0.0)
-            else:
-                self.current[i].add(height* (1- self.decay))
-
-            if self.current[i].smoothed() < self.decay/3.0:  #Look for when its gone quiet to clear the peak bars
-                self.peaks[i] = 0.0
-
-            self.peaks[i] *= (1- self.peak_decay)
-
-            # print("Spectrum.read> ", self.current[i].__str__())
+        self.current.track(fft, self.decay, self.peak_decay)
+        return self.current.smoothed()
 
 class SpectrumFrame(Frame, Spectrum):
     """
@@ -101,6 +99,8 @@ class SpectrumFrame(Frame, Spectrum):
     - scale is used to determine how wide the frame is as a % of the parent frame
     - channel 'left' or 'right' selects the audio channel and screen alignment
     """
+    requires = {'bins'}
+
 
     def __init__(self, parent, channel, scalers=None, align=None, theme=None, flip=False, outline=None, square=False, \
                  background=None, padding=0, bar_style=BarStyle(), spectrum_style=SpectrumStyle()):
@@ -173,37 +173,17 @@ class SpectrumFrame(Frame, Spectrum):
         # if self.width > self.w:
         #     self.configure()
 
-        self.read(self.channel)
+        heights = self.read(self.channel)
+        peaks   = self.peaks
 
         if self.config['spectrum_style'].flip:
-            # reversed(list(enumerate(self.current))) gives you pairs of (original_index, value) 
-            # starting from the end of the array.
-            for i, item in enumerate(reversed(self.current)):
-                x = i * (self.barw + self.bar_gap)
-                
-                # We use 'i' for the x position and colour, 
-                # but 'item.smoothed()' and 'self.peaks' logic must align.
-                colour_index = x if self.config['bar_style'].colour_mode == 'horz' else None
-                
-                # Note: If self.peaks also needs to be flipped, use len(self.current) - 1 - i
-                peak_val = self.peaks[len(self.current) - 1 - i]
-                
-                self.bar.draw(
-                    x + self.config['bar_style'].right_offset, 
-                    item.smoothed(), 
-                    self.barw, 
-                    peak_val, 
-                    colour_index=colour_index
-                )
-                # print("SpectrumFrame.update backwards> ", colour_index, self.config['bar_style'].colour_mode)
-        else:
-            for i in range(len(self.current)):
-                x = i * (self.barw + self.bar_gap)
-                colour_index = x if self.config['bar_style'].colour_mode == 'horz' else None
-                self.bar.draw( x+self.config['bar_style'].right_offset, self.current[i].smoothed(), self.barw, self.peaks[i], colour_index=colour_index)
-                # print("SpectrumFrame.update forwards> ", colour_index, self.config['bar_style'].colour_mode)
+            # Bars start from the end of the array, the peaks must align with them
+            heights, peaks = heights[::-1], peaks[::-1]
 
-        
+        # x is used for the position and the colour of each bar
+        x = np.arange(len(heights)) * (self.barw + self.bar_gap)
+        colour_indices = x if self.config['bar_style'].colour_mode == 'horz' else None
+        self.bar.draw_many(x + self.config['bar_style'].right_offset, heights, self.barw, peaks, colour_indices=colour_indices)
 
     @property
     def width(self):
@@ -213,6 +193,7 @@ class SpectrumFrame(Frame, Spectrum):
 
 """ A visualiser based on a circle display of spectrum lines """
 class Diamondiser(Frame, Spectrum):
+    requires = {'bins'}
     BARSPACE = 1
     def __init__(self, parent, channel, scalers=None, theme=None, align=None, barsize_pc=BARSPACE,background=None, z_order=0, **kwargs):
         Frame.__init__(self, parent, scalers=scalers, align=align, square=True, theme=theme,background=background, z_order=z_order)
@@ -232,16 +213,17 @@ class Diamondiser(Frame, Spectrum):
                              for _ in range(self.bars)]
 
     def update_screen(self):
-        self.read(self.channel)
+        heights = self.read(self.channel)
         radius  = self.centre_pc
 
         for ray_index, ray in enumerate(self.rays):
             col = self.max_radius*(ray_index/self.bars)
-            amp = radius*self.current[ray_index].smoothed() if self.current[ray_index].smoothed() > 0 else 0
+            amp = radius*heights[ray_index] if heights[ray_index] > 0 else 0
             ray.drawFrameCentredVector(ray_index*self.ray_angle, amplitude=amp, gain=1-radius, colour=col)
 
 
 class Octaviser(Frame, Spectrum):
+    requires = {'bins'}
     def __init__(self, parent, channel, scalers=None, align=('left', 'bottom'), theme=None):
         self.channel = channel
         Frame.__init__(self, parent, scalers=scalers, align=align)
@@ -276,6 +258,7 @@ Spectrum Analyser Frames - variants on
 """
 
 class Spectrum2chFrame(Frame): #""" Vert split - L/R """
+    requires = set()
     def __init__(self, parent, **kwargs) :
         Frame.__init__(self, parent, outline={'width':4,'colour':'light'}, **kwargs)
 
@@ -286,6 +269,7 @@ class Spectrum2chFrame(Frame): #""" Vert split - L/R """
 
 class SpectrumStereoFrame(Frame): #""" Horz Split screen - right flipped 'Apple Style' """
     # THis is vertically aligned, with one flipped
+    requires = set()
     def __init__(self, parent, scalers, align) :
         Frame.__init__(self, parent, scalers=scalers, align=align, background=None)
 
@@ -295,6 +279,7 @@ class SpectrumStereoFrame(Frame): #""" Horz Split screen - right flipped 'Apple
 
 class SpectrumStereoLRFrame(Frame): #""" Horz Split screen - LED Style right flipped  """
     # THis is vertically aligned, with one flipped
+    requires = set()
     def __init__(self, parent, scalers, align) :
         Frame.__init__(self, parent, scalers=scalers, align=align)
 
@@ -304,6 +289,7 @@ class SpectrumStereoLRFrame(Frame): #""" Horz Split screen - LED Style right fli
 
 class SpectrumStereoSplitFrame(Frame): #""" Horz Split screen - right flipped """
     # This is vertically aligned
+    requires = set()
     def __init__(self, parent, scalers, align) :
         Frame.__init__(self, parent, scalers=scalers, align=align, background={'colour':'background', 'per_frame_update':True})
         self += SpectrumFrame(self, 'right', scalers=(1.0, 0.5), align=('left','bottom'), bar_style=BarStyle(led_gap=0, flip=True, tip=True), spectrum_style=SpectrumStyle(barw_min=5, barsize_pc=0.5) )
@@ -311,6 +297,7 @@ class SpectrumStereoSplitFrame(Frame): #""" Horz Split screen - right flipped ""
         
 
 class SpectrumStereoOffsetFrame(Frame):
+    requires = set()
     def __init__(self, parent, scalers, align) :
         Frame.__init__(self, parent, scalers=scalers, align=align,background={'colour':'background', 'per_frame_update':True})
         self += SpectrumFrame(self, 'right', scalers=(1.0, 1.0), align=('left','top'),  bar_style=BarStyle(led_gap=0, tip=True,right_offset=2,), spectrum_style=SpectrumStyle(barw_min=8, barsize_pc=1.5), theme='red', background=None)
@@ -318,6 +305,7 @@ class SpectrumStereoOffsetFrame(Frame):
 
 
 class StereoSpectrumFrame(Frame):
+    requires = set()
     def __init__(self, parent, **kwargs):
         super().__init__(parent, **kwargs)
 
@@ -7,7 +7,7 @@ Mar 2026 Baloothebear4. v1.0
 
 '''
 
-from    pyvisualiser.core.framecore  import Frame, get_asset_path, Smoother, RowFramer, ColFramer
+from    pyvisualiser.core.framecore  import Frame, get_asset_path, SmootherBank, RowFramer, ColFramer
 from    pyvisualiser.core.components import Text, Line, Image, Bar
 from    pyvisualiser.styles.presets  import Centred, PI
 from    pyvisualiser.styles.styles   import *
@@ -19,10 +19,12 @@ class VU:
     """ A place for all the moving elements of a VU bar or meter """
     DECAY     = 0.3   # Lower is longer delay - This is the amount that a bar reduces each period
     PEAKDECAY = 0.01  # pc of Decay to use for peak bars
+    LOUDNESS  = ('lufs_momentary', 'lufs_short_term', 'lufs_integrated', 'true_peak', 'true_peak_max')  # channels in LUFS/dBTP
+    LOUDNESS_RANGE = 60.0  # dB spanned by a bar showing a loudness channel, ie -60 to 0
 
     def __init__(self, platform, channel, decay=DECAY, smooth=8):
         self.peaks          = 0.0            # This is used to hold the values and implement a smoothing factor
-        self.current        = Smoother(1.0, smooth)    # array of smoothers
+        self.current        = SmootherBank(1, 1.0, smooth)    # bank of one smoother
         self.decay          = decay
         self.peak_decay     = decay * VU.PEAKDECAY
         self.platform       = platform
@@ -31,29 +33,20 @@ class VU:
     def read(self):
         """
         Decay work by assuming that all bars naturally decay at a fixed rate and manner (eg lin /log)
-        Use the same method as spectrum analyser
+        Use the same method as spectrum analyser.
+        With audio rate ballistics the platform already supplies the VU and its PPM, so these are used directly,
+        otherwise (no ballistics, or a channel without a PPM, eg loudness) the level is smoothed here
         """
         target_height      = self.platform.vu[self.channel]
-        smoothedpeak = 0
+        if self.channel in VU.LOUDNESS:
+            target_height  = max(0.0, 1.0 + target_height / VU.LOUDNESS_RANGE)
+        ppm = self.platform.vu.get('ppm_' + self.channel) if getattr(self.platform, 'meters', None) is not None else None
+        if ppm is not None:
+            self.peaks = ppm
+            return target_height, self.peaks
 
-        if target_height > self.current.smoothed():
-            self.current.add(target_height)
-
-        if self.current.smoothed() > self.peaks:
-            self.peaks = self.current.smoothed()
-
-        height = self.current.smoothed()
-        if height > smoothedpeak: smoothedpeak = height
-
-        if self.current.smoothed() < self.decay/100.0:
-            self.current.add(0.0)
-        else:
-            self.current.add(height* (1- self.decay))
-
-        if self.current.smoothed() < self.decay/3.0:  #Look for when its gone quiet to clear the peak bars
-            self.peaks = 0.0
-
-        self.peaks *= (1- self.peak_decay)
+        height     = float(self.current.track(target_height, self.decay, self.peak_decay)[0])
+        self.peaks = float(self.current.peaks[0])
 
         return height, self.peaks
 
@@ -70,6 +63,8 @@ class VUMeter(Frame):
         - optional arc
         - optional background image
     """
+    requires = {'vu'}
+
  
     def __init__(self, parent, channel, scalers=None, align=Centred, outline=None, square=False, background=None, padding=0,
                  style: VUMeterStyle = None, z_order=0):
@@ -279,6 +274,8 @@ class VUFrame(Frame):
 
         Creates a bar, centred in a Frame as a % of the Frame width
     """
+    requires = {'vu'}
+
     def __init__(self, parent, channel, scalers=None, align=None, theme=None, background=None, \
                  barsize_pc=0.7, flip=False, outline=None,square=False, \
                  peak_h=1, barw_min=10, barw_max=400, tip=False, decay=VU.DECAY, orient='vert', \
@@ -298,6 +295,7 @@ class VUFrame(Frame):
             'tip':tip, 'decay':decay, 'orient':orient, \
             'style': style
         }
+        if channel in VU.LOUDNESS: self.requires = {'loudness'}
 
         Frame.__init__(self, parent, scalers=scalers, align=align,theme=theme,background=background, outline=outline,square=square)
         self.configure()
@@ -322,6 +320,24 @@ class VUFrame(Frame):
         self.bar.draw( 0, height, self.barw, peaks)
         # print("VUFrame.update>")
         return True
+
+
+class LoudnessFrame(TextFrame):
+    """
+        Displays an EBU R128 loudness reading as text eg 'S -14.2 LUFS'
+        - channel is one of VU.LOUDNESS
+    """
+    requires = {'loudness'}
+    LABELS   = {'lufs_momentary': ('M', 'LUFS'), 'lufs_short_term': ('S', 'LUFS'), 'lufs_integrated': ('I', 'LUFS'),
+                'true_peak': ('TP', 'dBTP'), 'true_peak_max': ('TP max', 'dBTP')}
+
+    def __init__(self, parent, channel='lufs_short_term', text=' TP max -88.8 dBTP ', **kwargs):
+        self.channel = channel
+        TextFrame.__init__(self, parent, text=text, update_fn=self.reading, **kwargs)
+
+    def reading(self):
+        label, unit = LoudnessFrame.LABELS[self.channel]
+        return "%s %5.1f %s" % (label, self.platform.vu[self.channel], unit)
     
 
 
@@ -329,6 +345,7 @@ class VUFrame(Frame):
 
 class VUMeterImageFrame(Frame):
     """ Image background based class - the """
+    requires = set()
     def __init__(self, parent, type=None, scalers=None, align=('centre', 'middle'),outline=None,square=False):
 
         Frame.__init__(self, parent, scalers=scalers, align=align, outline =outline,square=square)
@@ -364,6 +381,7 @@ class VUMeterImageFrame(Frame):
 
 
 class VU2chFrame(Frame):
+    requires = set()
     def __init__(self, parent, scalers=None, align=None, orient='vert', flip=False, led_h=5, led_gap=1,barsize_pc=0.7, theme=None, outline=None,background={'colour':'background', 'per_frame_update':True}, **kwargs):
         
         # Separate Frame args from VUFrame args to prevent TypeError in Frame.__init__
@@ -389,6 +407,7 @@ class VU2chFrame(Frame):
         # self.always_draw_background()
 
 class VUFlipFrame(Frame):
+    requires = set()
     def __init__(self, parent, scalers=None, align=None, orient='vert', flip=False,theme=None, outline=None,background={'colour':'background', 'per_frame_update':True},led_h=2, **kwargs):
         Frame.__init__(self, parent, scalers=scalers, align=align, outline=outline,background=background, theme=theme)
         self.orient = orient
@@ -409,6 +428,7 @@ class VUFlipFrame(Frame):
 
 
 class VUHorzFrame(Frame):
+    requires = set()
     def __init__(self, parent, channel, tip=False, **kwargs):
         # Split kwargs into Frame args and VUFrame args
         frame_keys = ['scalers', 'align', 'square', 'theme', 'background', 'outline', 'padding']
@@ -430,6 +450,7 @@ class VUHorzFrame(Frame):
 
 
 class VU2chHorzFrame(Frame):
+    requires = set()
     def __init__(self, parent, tip=False, **kwargs):
         # Split kwargs into Frame args and VUFrame args
         frame_keys = ['scalers', 'align', 'square', 'theme', 'background', 'outline', 'padding']
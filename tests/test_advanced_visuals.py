@@ -338,6 +338,8 @@ class AudioTest(Frame):
     """
     Checking out how all the audio metadata works:  bass, treble, bpm
     """
+    requires = {'beat', 'analysis'}
+
     def __init__(self, parent, metadata):
         Frame.__init__(self, parent)
         self.metadata = metadata
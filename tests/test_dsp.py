@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""
+DSP Known Values Test Script
+Checks the pure audio classes against reference values: the old per-band and per-bar loops they replaced,
+scipy run over the whole signal, and the levels a calibrated sine should read.
+"""
+
+import math
+import numpy as np
+from scipy.signal import sosfilt
+
+from pyvisualiser.core.processaudio import AudioRingBuffer, AudioConfig, BandPlan, LoudnessMeter, MeterBallistics, \
+                                           FilterBank, SampleEnvelope, VUGAIN, PPM_RELEASE
+from pyvisualiser.core.framecore import Smoother, SmootherBank
+
+RATE = 48000
+
+
+def sine(level_db, seconds, rate=RATE, freq=997, channels=2, fullscale=32767):
+    """ An interleaved int16 sine at level_db dBFS (peak) on every channel """
+    t = np.arange(int(rate * seconds)) / rate
+    s = (10 ** (level_db / 20) * fullscale * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+    return np.repeat(s, channels)
+
+
+def ring_overrun_keeps_newest():
+    ring = AudioRingBuffer(blocks=4, blocksize=8)
+    for i in range(10):
+        ring.write(np.full(8, i, dtype=np.int16))
+
+    read = []
+    while (block := ring.read()) is not None:
+        read.append(int(block[0]))
+    assert read == [7, 8, 9], read
+    assert ring.overruns == 7, ring.overruns
+    assert ring.empty_reads == 1, ring.empty_reads
+
+
+def ring_short_block():
+    ring = AudioRingBuffer(blocks=4, blocksize=8)
+    ring.write(np.arange(5, dtype=np.int16).tobytes())
+    assert list(ring.read()) == [0, 1, 2, 3, 4]
+
+
+def band_plan_matches_loop():
+    config         = AudioConfig(44100)
+    intervalUpperF = list(np.geomspace(100, config.lastcentrefreq, 24))
+    bins           = np.random.default_rng(1).random(config.bins)
+
+    # the per-band loop packFFT used before BandPlan
+    expected, startbin = [], 1
+    for band in intervalUpperF:
+        bincount = startbin
+        while bincount * config.binbandwidth <= band:
+            bincount += 1
+        expected.append(bins[startbin:bincount].mean())
+        startbin = bincount
+
+    plan = BandPlan(intervalUpperF, config.bins, config.binbandwidth)
+    assert len(plan) == len(intervalUpperF)
+    assert np.allclose(plan.pack(bins), expected)
+
+
+def smoother_bank_matches_smoother():
+    rng = np.random.default_rng(2)
+    for size in (5, 3):
+        bank      = SmootherBank(8, maximum=0.9, ave_size=size)
+        smoothers = [Smoother(0.9, size) for _ in range(8)]
+        for _ in range(20):
+            data = rng.random(8)
+            bank.add(data)
+            for s, d in zip(smoothers, data): s.add(d)
+            assert np.allclose(bank.smoothed(), [s.smoothed() for s in smoothers]), size
+
+
+def loudness_sine():
+    # -20dBFS peak sine on both channels: -23dB mean square each, summed gives -20 LUFS
+    meter = LoudnessMeter(RATE, 2, 32767.0)
+    data  = sine(-20, 5)
+    for i in range(0, len(data), 2048):
+        meter.push(data[i:i+2048])
+    levels = meter.read()
+    for name in ('lufs_momentary', 'lufs_short_term', 'lufs_integrated'):
+        assert abs(levels[name] + 20) < 0.1, (name, levels[name])
+    assert abs(levels['true_peak'] + 20) < 0.1, levels['true_peak']
+
+
+def meter_ballistics_sine():
+    meters = MeterBallistics(RATE, 2, 32767)
+    data   = sine(-26, 2)
+    for i in range(0, len(data), 512):
+        meters.push(data[i:i+512])
+    levels = meters.read()
+
+    # VU on the rmsVU scale, the PPM and sample peak sine calibrated to read the same
+    vu = 10 ** (-26 / 20) / math.sqrt(2) / VUGAIN
+    for name in ('left', 'ppm_left', 'peak_left', 'mono'):
+        assert abs(levels[name] / vu - 1) < 0.01, (name, levels[name], vu)
+
+    # the PPM falls 20dB in PPM_RELEASE
+    silence = np.zeros(1024, dtype=np.int16)
+    for _ in range(int(PPM_RELEASE * RATE / 512)):
+        meters.push(silence)
+        released = meters.read()
+    drop = 20 * math.log10(released['ppm_left'] / levels['ppm_left'])
+    assert abs(drop + 20) < 0.5, drop
+
+
+def filter_bank_state_carries():
+    bank = FilterBank(RATE, 2, 1024)
+    low  = bank.add(1500)
+    mid  = bank.add((200, 2000), 4, 'bandpass')
+    assert bank.add(1500) == low
+
+    data = (np.random.default_rng(3).standard_normal(RATE) * 3000).astype(np.int16)
+    for i in range(0, len(data), 512):
+        bank.push(data[i:i+512])
+
+    # the same as filtering the whole signal in one go
+    x = data.reshape(-1, 2).T.astype(np.float64)
+    for band, args in ((low, (1500,)), (mid, ((200, 2000), 4, 'bandpass'))):
+        expected = sosfilt(FilterBank.design(RATE, *args), x, axis=-1)[:, -1024:]
+        assert np.allclose(bank.get(band, 0), expected[0])
+        assert np.allclose(bank.get(band, None), expected.mean(axis=0))
+
+
+def sample_envelope():
+    samples = np.random.default_rng(4).standard_normal(1024).astype(np.float32)
+    groups  = samples.reshape(-1, 8) * 0.5
+    expected = {'minmax': np.stack((groups.min(axis=1), groups.max(axis=1))),
+                'peak':   np.abs(groups).max(axis=1),
+                'rms':    np.sqrt(np.mean(groups ** 2, axis=1)),
+                'mean':   groups.mean(axis=1)}
+    for kind, values in expected.items():
+        envelope = SampleEnvelope(1024, 8, kind, scale=0.5)
+        assert np.allclose(envelope.compute(samples), values, atol=1e-6), kind
+
+    try:
+        SampleEnvelope(1024, 8, 'median')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown envelope accepted")
+
+
+CHECKS = [ring_overrun_keeps_newest, ring_short_block, band_plan_matches_loop, smoother_bank_matches_smoother,
+          loudness_sine, meter_ballistics_sine, filter_bank_state_carries, sample_envelope]
+
+successes = 0
+failures = []
+
+for check in CHECKS:
+    print(f"Testing {check.__name__}...", end=" ")
+    try:
+        check()
+        print("OK")
+        successes += 1
+    except Exception as e:
+        print(f"FAIL: {type(e).__name__}: {e}")
+        failures.append(check.__name__)
+
+print(f"\n{successes} checks passed")
+if failures:
+    print(f"{len(failures)} failures: {failures}")